@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark du coût de transformation par région : réponse Open-Meteo -> payload d'upsert
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from data_api.mapping.common import dataframe_to_records
+from data_api.mapping.openmeteo_mapping import openmeteo_to_common_mapping, convert_to_harmonized_df
+
+HOURS = 24 * 365
+RUNS = 5
+
+
+def build_openmeteo_payload(hours):
+    start = datetime(2025, 3, 1)
+    hourly = {"time": [(start + timedelta(hours=index)).strftime("%Y-%m-%dT%H:%M") for index in range(hours)]}
+    for openmeteo_metric in openmeteo_to_common_mapping:
+        hourly[openmeteo_metric] = [
+            round(random.uniform(0, 100), 1) if random.random() > 0.01 else None
+            for _ in range(hours)
+        ]
+    return {"latitude": 48.85, "longitude": 2.35, "hourly_units": {"temperature_2m": "°C"}, "hourly": hourly}
+
+
+def legacy_transform(openmeteo_data, region):
+    # Chemin précédent : DataFrame de listes Python puis to_dict('records')
+    data = openmeteo_data["hourly"]
+    harmonized_data = {common_metric: data[openmeteo_metric] for openmeteo_metric, common_metric in openmeteo_to_common_mapping.items()}
+    df = pd.DataFrame(harmonized_data)
+    df['time'] = data["time"]
+    df['region_id'] = region["id"]
+    return df.to_dict('records')
+
+
+def columnar_transform(openmeteo_data, region):
+    return dataframe_to_records(convert_to_harmonized_df(openmeteo_data, region))
+
+
+def benchmark(name, transform, payload, region):
+    durations = []
+    for _ in range(RUNS):
+        started_at = time.perf_counter()
+        rows = transform(payload, region)
+        durations.append(time.perf_counter() - started_at)
+    best = min(durations)
+    print(f"{name:<10} {len(rows)} lignes : {best * 1000:.1f} ms par région ({len(rows) / best:.0f} lignes/s)")
+
+
+if __name__ == '__main__':
+    payload = build_openmeteo_payload(HOURS)
+    region = {"id": 1}
+    print(f"Transformation d'une région, {HOURS} heures x {len(openmeteo_to_common_mapping)} métriques (meilleur de {RUNS})")
+    benchmark("legacy", legacy_transform, payload, region)
+    benchmark("columnar", columnar_transform, payload, region)
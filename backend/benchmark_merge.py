@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark hors ligne de la fusion Open-Meteo + Visual Crossing, sur les serveurs de substitution locaux
+"""
+
+import os
+import time
+
+from data_api.stubs.provider_stubs import start_stub_server
+
+server, base_url = start_stub_server()
+os.environ["OPENMETEO_BASE_URL"] = base_url
+os.environ["VISUALCROSSING_BASE_URL"] = base_url
+# Le serveur de substitution accepte n'importe quelle clé
+os.environ.setdefault("VISUALCROSSING_API_KEY", "stub")
+# Chaque appel doit passer par le réseau local pour mesurer la récupération
+os.environ["PROVIDER_CACHE_ENABLED"] = "0"
+
+from data_api.ingestion.sources import fetch_harmonized_batch
+from data_api.mapping.merge import merge_sources
+from data_api.mapping.metrics import get_all_metrics
+from data_api.openmeteo import get_openmeteo_data_batch
+from data_api.visualcrossing import get_visualcrossing_data
+
+START_DATE = "2025-03-01"
+END_DATE = "2025-05-31"
+NUMBER_REGIONS = 15
+
+
+if __name__ == '__main__':
+    metrics = get_all_metrics()
+    regions = [
+        {"id": index + 1, "name": f"region {index + 1}", "latitude": -60 + index * 8, "longitude": -170 + index * 23}
+        for index in range(NUMBER_REGIONS)
+    ]
+
+    started_at = time.perf_counter()
+    frames = fetch_harmonized_batch(regions, metrics, START_DATE, END_DATE, sources=["openmeteo", "visualcrossing"])
+    fetch_and_merge = time.perf_counter() - started_at
+    rows = sum(len(frame) for frame in frames)
+    print(f"Récupération concurrente + fusion : {fetch_and_merge * 1000:.0f} ms pour {len(regions)} régions, {rows} lignes")
+
+    openmeteo_frames = get_openmeteo_data_batch(regions, metrics, START_DATE, END_DATE)
+    visualcrossing_frames = [get_visualcrossing_data(region, metrics, START_DATE, END_DATE) for region in regions]
+    started_at = time.perf_counter()
+    for openmeteo_frame, visualcrossing_frame in zip(openmeteo_frames, visualcrossing_frames):
+        merge_sources({"openmeteo": openmeteo_frame, "visualcrossing": visualcrossing_frame}, metrics)
+    merge_only = time.perf_counter() - started_at
+    print(f"Fusion seule : {merge_only * 1000:.1f} ms ({merge_only * 1000 / len(regions):.2f} ms par région)")
+
+    server.shutdown()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la construction des fenêtres d'entraînement LSTM : une année de données horaires x toutes les régions
+"""
+
+import time
+from datetime import datetime, timedelta
+from functools import reduce
+from itertools import pairwise
+
+import numpy as np
+
+from data_api.lstm.train_all_models import PACKET_SIZE, preprocess_train_data, min_max_normalize
+from data_api.mapping.metrics import get_all_metrics
+
+HOURS = 24 * 365
+REGIONS = 15
+RUNS = 3
+METRIC = "temperature"
+
+
+def build_rows(hours, regions):
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    times = [(start + timedelta(hours=index)).isoformat() for index in range(hours)]
+    metrics = get_all_metrics()
+    values = rng.uniform(0, 100, size=(regions, hours, len(metrics))).round(1).tolist()
+    return [
+        {"time": times[hour], "region_id": region_id + 1, **dict(zip(metrics, values[region_id][hour]))}
+        for region_id in range(regions)
+        for hour in range(hours)
+    ]
+
+
+def legacy_preprocess(data, metric):
+    # Chemin précédent : concaténation de listes par reduce, fenêtres et normalisation en boucle Python
+    exclusion_list = ["time", "region_id", "region"]
+    sorted_data = sorted(data, key=lambda x: (x["region_id"], x["time"]))
+    index_metric = list(filter(lambda x: x not in exclusion_list, data[0].keys())).index(metric)
+    features_data = [[value for key, value in row.items() if key not in exclusion_list] for row in sorted_data]
+    diff_indexes = [0] + [
+        index
+        for (index, (left, right)) in enumerate(pairwise(sorted_data))
+        if left["region_id"] != right["region_id"]
+    ] + [len(sorted_data) - 1]
+    regions_index_tuple = [(left, right - PACKET_SIZE) for (left, right) in pairwise(diff_indexes)]
+    features_data_no_cross_region = reduce(lambda x, y: x + y, [features_data[left:right] for left, right in regions_index_tuple])
+    transformed_data_packets = [
+        np.array(features_data_no_cross_region[index_left: index_left + (PACKET_SIZE + 1)])
+        for index_left in range(len(features_data_no_cross_region) - (PACKET_SIZE + 1))
+    ]
+    transformed_data_normalized = [min_max_normalize(packet) for packet in transformed_data_packets]
+    X, _ = np.split(np.array(transformed_data_normalized), [PACKET_SIZE], axis=1)
+    _, y = np.split(np.array(transformed_data_packets), [PACKET_SIZE], axis=1)
+    return X, y[:, :, index_metric]
+
+
+def benchmark(name, preprocess, rows):
+    durations = []
+    for _ in range(RUNS):
+        started_at = time.perf_counter()
+        X, y = preprocess(rows, METRIC)
+        durations.append(time.perf_counter() - started_at)
+    best = min(durations)
+    print(f"{name:<10} {len(X)} fenêtres {X.dtype} : {best:.2f} s ({len(X) / best:.0f} fenêtres/s, X = {X.nbytes / 1e6:.0f} Mo)")
+
+
+if __name__ == '__main__':
+    rows = build_rows(HOURS, REGIONS)
+    print(f"Fenêtrage de {REGIONS} régions x {HOURS} heures x {len(get_all_metrics())} métriques (meilleur de {RUNS})")
+    benchmark("legacy", legacy_preprocess, rows)
+    benchmark("vectorized", preprocess_train_data, rows)
@@ -0,0 +1,70 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import date
+
+from data_api.http_client import get_with_retry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESPONSE_CACHE_DIR = os.getenv("PROVIDER_CACHE_DIR", os.path.join(BASE_DIR, '..', 'provider_cache'))
+RESPONSE_CACHE_ENABLED = os.getenv("PROVIDER_CACHE_ENABLED", "1") == "1"
+# Ranges reaching today or later hold forecasts that keep changing; past ranges never do
+FORECAST_TTL_SECONDS = 30 * 60
+# Params left out of the cache key (credentials)
+UNCACHED_PARAMS = {"key"}
+
+
+def get_cache_ttl(end_date):
+    """
+    None means the response never expires.
+    """
+    return FORECAST_TTL_SECONDS if date.fromisoformat(str(end_date)) >= date.today() else None
+
+
+def get_cache_path(url, params):
+    cache_key = json.dumps(
+        [url, sorted((name, str(value)) for name, value in params.items() if name not in UNCACHED_PARAMS)]
+    )
+    digest = hashlib.sha256(cache_key.encode()).hexdigest()
+    return os.path.join(RESPONSE_CACHE_DIR, digest[:2], f"{digest}.json.gz")
+
+
+def read_cached_response(path, ttl):
+    try:
+        if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+    except (OSError, EOFError):
+        return None
+
+
+def write_cached_response(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def get_provider_json(url, params, end_date, provider=None):
+    """
+    Provider GET through a content-addressed, gzip-compressed on-disk cache of
+    raw responses, keyed by URL and params. Past date ranges are kept forever,
+    ranges reaching today expire after FORECAST_TTL_SECONDS.
+    """
+    path = get_cache_path(url, params)
+    if RESPONSE_CACHE_ENABLED:
+        content = read_cached_response(path, get_cache_ttl(end_date))
+        if content is not None:
+            return json.loads(content)
+
+    response = get_with_retry(url, params, provider)
+    if response.status_code != 200:
+        raise Exception(f"Error: {response.status_code}, {response.text}")
+
+    if RESPONSE_CACHE_ENABLED:
+        write_cached_response(path, response.content)
+    return response.json()
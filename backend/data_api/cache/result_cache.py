@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Total size of the serialized results held in-process, per worker
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+RESULT_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", 16 * 1024 * 1024))
+RESULT_CACHE_REDIS_URL = os.getenv("RESULT_CACHE_REDIS_URL")  # e.g. redis://localhost:6379/0
+RESULT_CACHE_REDIS_TTL_SECONDS = 2 * 60 * 60
+# Redis tier skipped for this long after a failed call
+RESULT_CACHE_REDIS_BACKOFF_SECONDS = 30
+GENERATION_KEY = "data_cache:generation"
+GENERATION_TIME_KEY = "data_cache:generation_time"
+
+
+class ResultCache:
+    """
+    Read-through cache of serialized query results.
+
+    Entries are keyed by the current data generation, so bumping the generation
+    after an ingestion makes every older entry unreachable. The in-process LRU
+    is bounded by the total bytes it holds; the optional Redis tier is shared
+    between workers and also holds the generation counter.
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES, redis_url=RESULT_CACHE_REDIS_URL):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.local_generation = 0
+        # Nothing bumped yet in this process, its data is as recent as its start
+        self.local_generation_time = time.time()
+        self.redis_client = self._connect_redis(redis_url)
+        self.redis_retry_at = 0.0
+
+    def _connect_redis(self, redis_url):
+        if not redis_url:
+            return None
+        try:
+            import redis
+            return redis.Redis.from_url(redis_url, socket_timeout=0.5)
+        except ImportError:
+            print("redis is not installed, result cache stays in-process only")
+            return None
+
+    def _redis_call(self, method, *args):
+        if self.redis_client is None or time.monotonic() < self.redis_retry_at:
+            return None
+        try:
+            return getattr(self.redis_client, method)(*args)
+        except Exception as e:
+            # Requests don't each wait for the socket timeout while Redis is down
+            self.redis_retry_at = time.monotonic() + RESULT_CACHE_REDIS_BACKOFF_SECONDS
+            print(f"Result cache Redis tier unavailable for {RESULT_CACHE_REDIS_BACKOFF_SECONDS}s: {e}")
+            return None
+
+    def get_generation(self):
+        generation = self._redis_call("get", GENERATION_KEY)
+        return int(generation) if generation is not None else self.local_generation
+
+    def get_generation_state(self):
+        """
+        Returns (generation, epoch seconds of the bump that started it).
+        """
+        values = self._redis_call("mget", [GENERATION_KEY, GENERATION_TIME_KEY])
+        if values is not None and values[0] is not None:
+            generation, generation_time = values
+            return int(generation), float(generation_time) if generation_time is not None else self.local_generation_time
+        return self.local_generation, self.local_generation_time
+
+    def bump_generation(self):
+        bumped_at = time.time()
+        with self.lock:
+            self.local_generation += 1
+            self.local_generation_time = bumped_at
+            self.entries.clear()
+            self.total_bytes = 0
+        generation = self._redis_call("incr", GENERATION_KEY)
+        self._redis_call("set", GENERATION_TIME_KEY, bumped_at)
+        return generation if generation is not None else self.local_generation
+
+    def make_key(self, namespace, params):
+        payload = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"data_cache:{namespace}:{self.get_generation()}:{digest}"
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                return value
+
+        value = self._redis_call("get", key)
+        if value is not None:
+            self._set_local(key, value)
+        return value
+
+    def set(self, key, value):
+        if len(value) > RESULT_CACHE_MAX_ENTRY_BYTES:
+            return
+        self._set_local(key, value)
+        self._redis_call("set", key, value, RESULT_CACHE_REDIS_TTL_SECONDS)
+
+    def _set_local(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self.entries[key] = value
+            self.total_bytes += len(value)
+            # Least recently used entries go first
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def get_or_load(self, namespace, params, load):
+        """
+        Returns the cached result for (namespace, params), calling load() and
+        storing its JSON serialization on a miss.
+        """
+        key = self.make_key(namespace, params)
+        cached = self.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        result = load()
+        self.set(key, json.dumps(result, separators=(",", ":"), default=str).encode())
+        return result
+
+
+# Shared cache instance
+result_cache = ResultCache()
@@ -1,14 +1,92 @@
 from datetime import datetime, date
+import base64
+import binascii
+import json
 import re
 
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
+from data_api.cache.result_cache import result_cache
 from data_api.ingestion.cities_ingestion import get_all_regions
+from data_api.regions.registry import region_registry
 from data_api.mapping.metrics import get_all_metrics
-from data_api.supabase.database import load_normalized_data, load_predictions, get_latest_timestamp_by_cities
+from data_api.renderers import NDJSONRenderer, ndjson_lines
+from data_api.supabase.database import (
+    load_normalized_data, load_normalized_data_page, load_normalized_data_buckets, load_normalized_data_daily,
+    load_predictions, load_predictions_page,
+    get_latest_timestamp_by_cities
+)
 
+RESOLUTIONS = ["hour", "day", "week"]
+# API aggregate name -> SQL aggregate function
+AGGREGATES = {"mean": "avg", "min": "min", "max": "max", "sum": "sum"}
 
-def get_data_common(regions=None, start=None, end=None, metrics=None):
+DEFAULT_PAGE_LIMIT = 500
+MAX_PAGE_LIMIT = 1000  # Supabase caps a single PostgREST response at 1000 rows
+
+DEFAULT_NEAREST_K = 1
+MAX_NEAREST_K = 50
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        cursor_time, cursor_region_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        datetime.fromisoformat(cursor_time)
+        return cursor_time, int(cursor_region_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        return None
+
+
+def parse_page_limit(limit):
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return None
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        return None
+    return limit
+
+
+def get_latest_timestamps():
+    return result_cache.get_or_load("latest_timestamps", {}, get_latest_timestamp_by_cities)
+
+
+def get_query_cache_params(regions, metrics, **params):
+    return {
+        "regions": sorted({region.lower() for region in regions}),
+        "metrics": list(metrics),
+        **{name: str(value) if value is not None else None for name, value in params.items()}
+    }
+
+
+def iter_pages(load_page):
+    """
+    Yields rows page after page, load_page(cursor) returning (rows, next_cursor).
+    Only one page is held in memory at a time.
+    """
+    page_key = None
+    while True:
+        rows, page_key = load_page(page_key)
+        yield from rows
+        if page_key is None:
+            return
+
+
+def stream_rows(load_page):
+    return StreamingHttpResponse(
+        ndjson_lines(iter_pages(load_page)),
+        content_type=NDJSONRenderer.media_type,
+        status=status.HTTP_200_OK
+    )
+
+
+def get_data_common(regions=None, start=None, end=None, metrics=None, limit=None, cursor=None, stream=False,
+                    resolution=None, aggregate=None):
     # Extract parameters from query params
     regions_param = regions
     start_param = start
@@ -51,21 +129,104 @@ def get_data_common(regions=None, start=None, end=None, metrics=None):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    invalid_regions = set(regions) - set(all_regions)
+    invalid_regions = region_registry.get_unknown_names(regions)
     if invalid_regions:
         return Response(
             {'error': f"Unknown region(s): {', '.join(invalid_regions)}"},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    data = load_normalized_data(start, end, regions, metrics)
+    if resolution and resolution not in RESOLUTIONS:
+        return Response(
+            {'error': f"Unknown resolution: {resolution}. Use one of {', '.join(RESOLUTIONS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if aggregate and aggregate not in AGGREGATES:
+        return Response(
+            {'error': f"Unknown aggregate: {aggregate}. Use one of {', '.join(AGGREGATES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Rows are stored hourly, so only coarser resolutions need an aggregation
+    if resolution and resolution != "hour":
+        if limit is not None or cursor is not None:
+            return Response(
+                {'error': 'Pagination is only available for hourly data'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sql_aggregate = AGGREGATES[aggregate or "mean"]
+        if resolution == "day":
+            # Served by the rollup maintained by update_ingestion
+            data = result_cache.get_or_load(
+                "normalized_data_daily",
+                get_query_cache_params(regions, metrics, start=start, end=end, aggregate=sql_aggregate),
+                lambda: load_normalized_data_daily(start, end, regions, metrics, sql_aggregate)
+            )
+            return Response(
+                data,
+                status=status.HTTP_200_OK
+            )
+
+        data = result_cache.get_or_load(
+            "normalized_data_buckets",
+            get_query_cache_params(regions, metrics, start=start, end=end, resolution=resolution, aggregate=sql_aggregate),
+            lambda: load_normalized_data_buckets(start, end, regions, metrics, resolution, sql_aggregate)
+        )
+        return Response(
+            data,
+            status=status.HTTP_200_OK
+        )
+
+    if stream:
+        return stream_rows(
+            lambda page_key: load_normalized_data_page(start, end, regions, metrics, MAX_PAGE_LIMIT, page_key)
+        )
+
+    if limit is None and cursor is None:
+        data = result_cache.get_or_load(
+            "normalized_data",
+            get_query_cache_params(regions, metrics, start=start, end=end),
+            lambda: load_normalized_data(start, end, regions, metrics)
+        )
+        return Response(
+            data,
+            status=status.HTTP_200_OK
+        )
+
+    page_limit = parse_page_limit(limit if limit is not None else DEFAULT_PAGE_LIMIT)
+    if page_limit is None:
+        return Response(
+            {'error': f'Invalid limit. Use an integer between 1 and {MAX_PAGE_LIMIT}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    page_key = None
+    if cursor:
+        page_key = decode_cursor(cursor)
+        if page_key is None:
+            return Response(
+                {'error': 'Invalid cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    data, last_key = result_cache.get_or_load(
+        "normalized_data_page",
+        get_query_cache_params(regions, metrics, start=start, end=end, limit=page_limit, cursor=cursor),
+        lambda: load_normalized_data_page(start, end, regions, metrics, page_limit, page_key)
+    )
     return Response(
-        data,
+        {
+            'cursor': encode_cursor(last_key) if last_key else None,
+            'next': None,
+            'results': data
+        },
         status=status.HTTP_200_OK
     )
 
 
-def get_predictions(regions=None, start=None, metrics=None):
+def get_predictions(regions=None, start=None, metrics=None, stream=False):
     regions_param = regions
     start_param = start
 
@@ -73,7 +234,7 @@ def get_predictions(regions=None, start=None, metrics=None):
     metrics_param = metrics
     if not start_param:
         start = next(iter(sorted(
-            get_latest_timestamp_by_cities(),
+            get_latest_timestamps(),
             key=lambda x: x["latest_time"]
         )), None)["latest_time"]
     else:
@@ -100,15 +261,65 @@ def get_predictions(regions=None, start=None, metrics=None):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    invalid_regions = set(regions) - set(all_regions)
+    invalid_regions = region_registry.get_unknown_names(regions)
     if invalid_regions:
         return Response(
             {'error': f"Unknown region(s): {', '.join(invalid_regions)}"},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    data = load_predictions(start, regions, metrics)
+    if stream:
+        return stream_rows(
+            lambda page_key: load_predictions_page(start, regions, metrics, MAX_PAGE_LIMIT, page_key)
+        )
+
+    data = result_cache.get_or_load(
+        "predictions",
+        get_query_cache_params(regions, metrics, start=start),
+        lambda: load_predictions(start, regions, metrics)
+    )
     return Response(
         data,
         status=status.HTTP_200_OK
-    )
\ No newline at end of file
+    )
+
+def get_nearest_regions(lat=None, lon=None, k=None):
+    try:
+        lat = float(lat)
+        lon = float(lon)
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'lat and lon are required and must be numbers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        return Response(
+            {'error': 'lat must be within [-90, 90] and lon within [-180, 180]'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        k = int(k) if k is not None else DEFAULT_NEAREST_K
+    except (TypeError, ValueError):
+        k = None
+    if k is None or k < 1 or k > MAX_NEAREST_K:
+        return Response(
+            {'error': f"k must be an integer between 1 and {MAX_NEAREST_K}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    nearest = region_registry.get_nearest(lat, lon, k)
+    return Response(
+        [
+            {
+                'id': region['id'],
+                'name': region['name'],
+                'latitude': region['latitude'],
+                'longitude': region['longitude'],
+                'distance_km': round(distance, 3)
+            }
+            for region, distance in nearest
+        ],
+        status=status.HTTP_200_OK
+    )
@@ -0,0 +1,71 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from data_api.cache.result_cache import result_cache
+from data_api.data.data import get_latest_timestamps
+
+DEFAULT_MAX_AGE_SECONDS = 60 * 60  # ingestion runs hourly
+
+
+def get_data_version():
+    """
+    Returns (version digest, last modification epoch) of the served data.
+    The cache generation is bumped after every ingestion and prediction write,
+    including revised forecast hours that leave the latest timestamps unchanged.
+    """
+    generation, generation_time = result_cache.get_generation_state()
+    latest_timestamps = sorted(
+        (row["region_id"], row["latest_time"]) for row in get_latest_timestamps()
+    )
+    digest = hashlib.sha256(json.dumps([generation, latest_timestamps]).encode()).hexdigest()
+
+    return digest, int(generation_time)
+
+
+def seconds_until_next_ingestion():
+    from data_api.routes import scheduler
+
+    job = scheduler.get_job('ingestion_job')
+    if job is None or job.next_run_time is None:
+        return DEFAULT_MAX_AGE_SECONDS
+    remaining = (job.next_run_time - datetime.now(timezone.utc)).total_seconds()
+    return max(0, int(remaining))
+
+
+def get_request_signature(request):
+    query_params = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+    body = request.data if isinstance(request.data, dict) else {}
+    return {
+        "path": request.path,
+        "query": query_params,
+        "body": body,
+        "format": getattr(request, 'accepted_media_type', None)
+    }
+
+
+def conditional_get(request, build_response, extra=None):
+    """
+    Answers with 304 Not Modified when the client's If-None-Match / If-Modified-Since
+    still matches the ingested data version, without calling build_response().
+    Otherwise builds the response and tags it with ETag, Last-Modified and a
+    Cache-Control max-age lasting until the next scheduled ingestion.
+    """
+    version, last_modified = get_data_version()
+    signature = json.dumps([version, get_request_signature(request), extra], sort_keys=True, default=str)
+    etag = f'"{hashlib.sha256(signature.encode()).hexdigest()[:32]}"'
+    max_age = seconds_until_next_ingestion()
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_response()
+        if response.status_code != 200:
+            return response
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=max_age)
+    return response
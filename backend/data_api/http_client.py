@@ -0,0 +1,164 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HOST_CONCURRENCY = int(os.getenv("PROVIDER_HOST_CONCURRENCY", 4))
+POOL_CONNECTIONS = 8  # hosts with a kept-alive pool
+POOL_MAXSIZE = max(HOST_CONCURRENCY, 8)  # connections kept alive per host
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+# Longest single wait, whatever the server's Retry-After says
+MAX_RETRY_DELAY_SECONDS = int(os.getenv("PROVIDER_MAX_RETRY_DELAY_SECONDS", 30))
+# Total wait across the retries of one request, beyond it the request gives up
+RETRY_BUDGET_SECONDS = int(os.getenv("PROVIDER_RETRY_BUDGET_SECONDS", 60))
+CONNECT_TIMEOUT_SECONDS = 5
+READ_TIMEOUT_SECONDS = 30
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+LATENCY_BUCKETS_SECONDS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+host_semaphores = {}
+host_semaphores_lock = threading.Lock()
+
+
+def create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "application/json"})
+    return session
+
+
+# Shared by every provider call so TCP/TLS connections are reused across requests
+session = create_session()
+
+
+class LatencyHistograms:
+    """
+    Per-provider request latency histograms (cumulative buckets, like Prometheus).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_SECONDS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, provider, seconds, status_code):
+        with self.lock:
+            histogram = self.histograms.setdefault(provider, {
+                "count": 0,
+                "sum": 0.0,
+                "buckets": {str(bucket): 0 for bucket in self.buckets + ["+Inf"]},
+                "status_codes": {}
+            })
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            for bucket in self.buckets:
+                if seconds <= bucket:
+                    histogram["buckets"][str(bucket)] += 1
+            histogram["buckets"]["+Inf"] += 1
+            status_key = str(status_code)
+            histogram["status_codes"][status_key] = histogram["status_codes"].get(status_key, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                provider: {
+                    **histogram,
+                    "buckets": dict(histogram["buckets"]),
+                    "status_codes": dict(histogram["status_codes"]),
+                    "mean": histogram["sum"] / histogram["count"] if histogram["count"] else None
+                }
+                for provider, histogram in self.histograms.items()
+            }
+
+
+latency_histograms = LatencyHistograms()
+
+
+def get_host_semaphore(url):
+    host = urlsplit(url).netloc
+    with host_semaphores_lock:
+        if host not in host_semaphores:
+            host_semaphores[host] = threading.BoundedSemaphore(HOST_CONCURRENCY)
+        return host_semaphores[host]
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header, in seconds or as an HTTP-date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def get_retry_delay(response, attempt):
+    """
+    Unclamped delay before the next attempt: the server's Retry-After if any,
+    jittered exponential backoff otherwise.
+    """
+    retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    # Full jitter, so concurrent workers don't retry in lockstep
+    return random.uniform(0, BACKOFF_SECONDS * 2 ** attempt)
+
+
+def get_with_retry(url, params=None, provider=None):
+    """
+    GET through the shared pooled session, limited to HOST_CONCURRENCY
+    concurrent requests per host and retried with jittered exponential backoff
+    on connection errors, timeouts, 429 and 5xx responses. Waits are capped
+    at MAX_RETRY_DELAY_SECONDS and the request gives up when the next wait
+    would exceed what is left of RETRY_BUDGET_SECONDS. The last response is
+    returned as is once retries are exhausted. Each attempt is recorded in
+    the latency histogram of `provider` (the host by default).
+    """
+    provider = provider or urlsplit(url).netloc
+    retry_budget = RETRY_BUDGET_SECONDS
+    for attempt in range(MAX_RETRIES + 1):
+        response, error = None, None
+        with get_host_semaphore(url):
+            started_at = time.perf_counter()
+            try:
+                response = session.get(url, params=params, timeout=(CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            latency_histograms.observe(
+                provider,
+                time.perf_counter() - started_at,
+                response.status_code if response is not None else type(error).__name__
+            )
+
+        if response is not None and response.status_code not in RETRY_STATUS_CODES:
+            return response
+        if attempt == MAX_RETRIES:
+            break
+        delay = get_retry_delay(response, attempt)
+        if delay > retry_budget:
+            # A far Retry-After would hold this worker for nothing
+            break
+        delay = min(delay, MAX_RETRY_DELAY_SECONDS)
+        retry_budget -= delay
+        time.sleep(delay)
+
+    if response is None:
+        raise error
+    return response
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from data_api.cache.result_cache import result_cache
+from data_api.ingestion.change_detection import DIGEST_COLUMN, compute_row_digests
+from data_api.ingestion.concurrency import map_concurrently
+from data_api.ingestion.sources import fetch_harmonized_batch
+from data_api.lstm.feature_store import feature_store
+from data_api.mapping.common import dataframe_to_records
+from data_api.mapping.metrics import get_all_metrics
+from data_api.regions.registry import region_registry
+from data_api.supabase.database import save_normalized_data, refresh_normalized_data_daily
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE_FILE = os.path.join(BASE_DIR, '..', 'backfill_state.json')
+BACKFILL_MAX_WORKERS = 4
+BACKFILL_REQUESTS_PER_SECOND = 2
+
+
+class RateLimiter:
+    """
+    Spaces calls at least 1 / rate seconds apart across all threads.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_call_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            call_at = max(now, self.next_call_at)
+            self.next_call_at = call_at + self.interval
+        time.sleep(max(0.0, call_at - now))
+
+
+class BackfillState:
+    """
+    Keys of the completed work units, saved to a JSON file after each unit so
+    an interrupted backfill resumes where it stopped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.completed = set()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.completed = set(json.load(f).get("completed", []))
+
+    def is_completed(self, key):
+        return key in self.completed
+
+    def mark_completed(self, key):
+        with self.lock:
+            self.completed.add(key)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"completed": sorted(self.completed)}, f)
+            os.replace(tmp_path, self.path)
+
+
+def get_month_ranges(start_date, end_date):
+    ranges = []
+    month_start = start_date
+    while month_start <= end_date:
+        next_month = (month_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        ranges.append((month_start, min(next_month - timedelta(days=1), end_date)))
+        month_start = next_month
+    return ranges
+
+
+def get_work_units(regions, start_date, end_date):
+    """
+    One unit per (region, month), months clipped to [start_date, end_date].
+    """
+    return [
+        {"key": f"{region['id']}:{month_start}:{month_end}", "region": region, "start": month_start, "end": month_end}
+        for region in regions
+        for month_start, month_end in get_month_ranges(start_date, end_date)
+    ]
+
+
+def run_backfill(start_date, end_date=None, state_file=DEFAULT_STATE_FILE,
+                 max_workers=BACKFILL_MAX_WORKERS, requests_per_second=BACKFILL_REQUESTS_PER_SECOND):
+    end_date = end_date or date.today()
+    all_metrics = get_all_metrics()
+    state = BackfillState(state_file)
+    rate_limiter = RateLimiter(requests_per_second)
+
+    units = get_work_units(region_registry.all(), start_date, end_date)
+    pending_units = [unit for unit in units if not state.is_completed(unit["key"])]
+    print(f"Backfill {start_date} -> {end_date}: {len(pending_units)}/{len(units)} units to run")
+
+    progress = {"done": 0, "rows": 0}
+    progress_lock = threading.Lock()
+    started_at = time.monotonic()
+
+    def run_unit(unit):
+        rate_limiter.wait()
+        # Same source merge as the scheduled ingestion, so both write the same rows
+        dataframe = fetch_harmonized_batch([unit["region"]], all_metrics, unit["start"], unit["end"])[0]
+        dataframe[DIGEST_COLUMN] = compute_row_digests(dataframe, all_metrics).values
+        rows = dataframe_to_records(dataframe)
+
+        report = save_normalized_data(rows)
+        feature_store.update_ingested([(unit["region"]["id"], dataframe)], report)
+        if report["rows_failed"]:
+            raise Exception(f"{report['rows_failed']} rows failed to be written")
+        refresh_normalized_data_daily(rows)
+        state.mark_completed(unit["key"])
+
+        with progress_lock:
+            progress["done"] += 1
+            progress["rows"] += len(rows)
+            elapsed = time.monotonic() - started_at
+            print(
+                f"[{progress['done']}/{len(pending_units)}] {unit['region']['name']} "
+                f"{unit['start']} -> {unit['end']}: {len(rows)} rows "
+                f"({progress['rows'] / elapsed:.0f} rows/s, {progress['done'] / elapsed:.2f} units/s)"
+            )
+        return len(rows)
+
+    results = map_concurrently(run_unit, pending_units, max_workers)
+    failed_units = [unit for unit, _, error in results if error is not None]
+    for unit, _, error in results:
+        if error is not None:
+            print(f"Backfill unit {unit['key']} ({unit['region']['name']}) failed: {error}")
+
+    if progress["rows"]:
+        result_cache.bump_generation()
+
+    print(
+        f"Backfill finished in {time.monotonic() - started_at:.1f}s: {progress['done']} units, "
+        f"{progress['rows']} rows, {len(failed_units)} failed (rerun to resume)"
+    )
+    return failed_units
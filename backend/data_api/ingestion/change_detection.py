@@ -0,0 +1,28 @@
+import pandas as pd
+
+DIGEST_COLUMN = "digest"
+# Values are compared at this precision so float noise doesn't count as a change
+DIGEST_DECIMALS = 4
+
+
+def compute_row_digests(dataframe, metrics):
+    """
+    Digest of each row's metric vector, computed column-wise by pandas.
+    """
+    values = dataframe[metrics].astype("float64").round(DIGEST_DECIMALS)
+    hashes = pd.util.hash_pandas_object(values, index=False)
+    return hashes.map(lambda value: format(value, "016x"))
+
+
+def drop_unchanged_rows(dataframe, metrics, stored_digests, time_keys):
+    """
+    Adds the digest column and keeps only rows whose digest differs from the
+    stored one for the same (region_id, hour), new hours included.
+    """
+    dataframe = dataframe.assign(**{DIGEST_COLUMN: compute_row_digests(dataframe, metrics).values})
+    stored = pd.Series(
+        [stored_digests.get((region_id, time_key)) for region_id, time_key in zip(dataframe["region_id"], time_keys)],
+        index=dataframe.index,
+        dtype="object"
+    )
+    return dataframe[stored != dataframe[DIGEST_COLUMN]]
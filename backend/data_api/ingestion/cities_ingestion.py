@@ -1,3 +1,4 @@
+from data_api.regions.registry import region_registry
 from data_api.supabase.database import save_cities
 
 cities = [
@@ -18,11 +19,13 @@ cities = [
     {"name": "istanbul", "latitude": 41.0082, "longitude": 28.9784}
 ]
 
-def get_all_regions(): # On peut améliorer redondance
-    return list(map(lambda x: x["name"].lower(), cities))
+def get_all_regions():
+    return region_registry.get_names()
 
 def get_coorindates(city_name):
-    city = filter(lambda x: x["name"] == city_name, cities)[0]
+    city = region_registry.get_by_name(city_name)
+    if city is None:
+        raise ValueError(f"Unknown region: {city_name}")
 
     return city["latitude"], city["longitude"]
 
@@ -0,0 +1,24 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+INGESTION_MAX_WORKERS = int(os.getenv("INGESTION_MAX_WORKERS", 8))
+
+
+def map_concurrently(function, items, max_workers=INGESTION_MAX_WORKERS):
+    """
+    Calls function(item) for every item on a bounded thread pool.
+    Returns (item, result, error) tuples in the order of items, so one failing
+    item doesn't discard the others.
+    """
+    def call(item):
+        try:
+            return item, function(item), None
+        except Exception as e:
+            return item, None, e
+
+    items = list(items)
+    if not items:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
@@ -0,0 +1,49 @@
+import os
+
+from data_api.ingestion.concurrency import map_concurrently
+from data_api.mapping.merge import merge_sources
+from data_api.openmeteo import get_openmeteo_data_batch
+from data_api.visualcrossing import get_visualcrossing_data, is_visualcrossing_configured
+
+# Providers merged by ingestion, e.g. "openmeteo,visualcrossing"
+INGESTION_SOURCES = os.getenv("INGESTION_SOURCES", "openmeteo").split(",")
+
+
+def fetch_harmonized_batch(regions, metrics, start_date, end_date, sources=INGESTION_SOURCES):
+    """
+    Fetches every configured provider concurrently (Open-Meteo in one
+    multi-location request, Visual Crossing per region) and merges them per
+    region. Returns one DataFrame per region, in the order of regions.
+    A failing provider is left out of the merge; all failing is an error.
+    """
+    tasks = []
+    if "openmeteo" in sources:
+        tasks.append(("openmeteo", None))
+    if "visualcrossing" in sources:
+        if is_visualcrossing_configured():
+            tasks += [("visualcrossing", region) for region in regions]
+        else:
+            print("Source visualcrossing skipped: VISUALCROSSING_API_KEY is not set")
+
+    def fetch(task):
+        source, region = task
+        if source == "openmeteo":
+            return get_openmeteo_data_batch(regions, metrics, start_date, end_date)
+        return get_visualcrossing_data(region, metrics, start_date, end_date)
+
+    frames_by_region_id = {region["id"]: {} for region in regions}
+    errors = []
+    for (source, region), result, error in map_concurrently(fetch, tasks):
+        if error is not None:
+            print(f"Source {source} failed{' for ' + region['name'] if region else ''}: {error}")
+            errors.append(error)
+        elif source == "openmeteo":
+            for openmeteo_region, dataframe in zip(regions, result):
+                frames_by_region_id[openmeteo_region["id"]][source] = dataframe
+        else:
+            frames_by_region_id[region["id"]][source] = result
+
+    if any(not frames for frames in frames_by_region_id.values()):
+        raise errors[0] if errors else Exception("No source configured")
+
+    return [merge_sources(frames_by_region_id[region["id"]], metrics) for region in regions]
@@ -1,32 +1,127 @@
-from datetime import date
+from datetime import date, datetime, time, timezone
 
+from data_api.cache.result_cache import result_cache
+from data_api.ingestion.change_detection import drop_unchanged_rows
+from data_api.ingestion.concurrency import map_concurrently
+from data_api.mapping.common import TIME_FORMAT, dataframe_to_records
 from data_api.mapping.metrics import get_all_metrics
-from data_api.openmeteo import get_openmeteo_data
-from data_api.supabase.database import save_normalized_data, load_regions, get_latest_timestamp_by_cities
+from data_api.ingestion.sources import fetch_harmonized_batch
+from data_api.lstm.feature_store import feature_store
+from data_api.openmeteo import chunk_regions
+from data_api.regions.registry import region_registry
+from data_api.supabase.database import (
+    save_normalized_data, get_latest_timestamp_by_cities, refresh_normalized_data_daily,
+    load_row_digests
+)
 
 
-def update_ingestion(end_date = date.today()):
+# Start of the history for regions that have no data yet
+DEFAULT_START_DATE = date(2025, 3, 1)
+
+
+def parse_timestamp(value):
+    """
+    Parses a stored or provider timestamp to a naive UTC datetime.
+    """
+    timestamp = datetime.fromisoformat(str(value))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def update_ingestion(end_date=None):
+    end_date = end_date or date.today()
+    last_hour = datetime.combine(end_date, time(23))
+    current_hour = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
     all_metrics = get_all_metrics()
-    all_regions = load_regions()
+    all_regions = region_registry.all()
     latest_timestamp_by_cities = get_latest_timestamp_by_cities()
 
-    all_data = []
+    latest_time_by_region_id = {
+        row["region_id"]: parse_timestamp(row["latest_time"])
+        for row in latest_timestamp_by_cities
+        if row["latest_time"]
+    }
 
+    # Stored past hours are final, stored future hours are forecasts that
+    # Open-Meteo may have revised since. Hours up to the cutoff are not
+    # fetched again; forecast hours are, and only the changed ones are written.
+    cutoff_by_region_id = {
+        region_id: min(latest_time, current_hour)
+        for region_id, latest_time in latest_time_by_region_id.items()
+    }
+
+    # Open-Meteo works with whole days, so regions are fetched from the day of
+    # their cutoff and the hours before it are dropped before writing.
+    regions_by_start_time = {}
     for region in all_regions:
-        start_time = list(filter(
-            lambda x: x["region_id"] == region["id"],
-            latest_timestamp_by_cities
-        ))[0]["latest_time"][:10]
+        cutoff = cutoff_by_region_id.get(region["id"])
+        if cutoff is not None and cutoff >= last_hour:
+            continue
+        start_time = cutoff.date() if cutoff is not None else DEFAULT_START_DATE
+        regions_by_start_time.setdefault(str(start_time), []).append(region)
+
+    if not regions_by_start_time:
+        print("Ingestion skipped, every region is up to date")
+        return
+
+    batches = [
+        (start_time, regions)
+        for start_time, regions_with_start_time in regions_by_start_time.items()
+        for regions in chunk_regions(regions_with_start_time)
+    ]
+
+    # Only regions with stored rows can have stored forecast hours to compare with
+    fetched_cutoffs = {
+        region["id"]: cutoff_by_region_id[region["id"]]
+        for regions in regions_by_start_time.values()
+        for region in regions
+        if region["id"] in cutoff_by_region_id
+    }
+    stored_digests = {
+        (row["region_id"], parse_timestamp(row["time"]).strftime(TIME_FORMAT)): row["digest"]
+        for row in (
+            load_row_digests(list(fetched_cutoffs), min(fetched_cutoffs.values()).isoformat())
+            if fetched_cutoffs else []
+        )
+        if row["digest"]
+    }
+
+    def fetch_batch(batch):
+        start_time, regions = batch
+        return fetch_harmonized_batch(regions, all_metrics, start_time, end_date)
+
+    all_data = []
+    changed_dataframes = []
+
+    # Batches are fetched concurrently, the run lasts as long as the slowest one
+    for (start_time, regions), harmonized_dataframes, error in map_concurrently(fetch_batch, batches):
+        if error is not None:
+            # Left for the next run, their latest timestamp hasn't moved
+            region_names = ", ".join(region["name"] for region in regions)
+            print(f"Ingestion failed for regions {region_names}: {error}")
+            continue
+
+        for region, harmonized_dataframe in zip(regions, harmonized_dataframes):
+            time_keys = harmonized_dataframe["time"]
+            cutoff = cutoff_by_region_id.get(region["id"])
+            if cutoff is not None:
+                harmonized_dataframe = harmonized_dataframe[time_keys > cutoff]
+                time_keys = time_keys[time_keys > cutoff]
 
-        openmeteo_dataframe = get_openmeteo_data(region, all_metrics, start_time, end_date)
-        openmeteo_data = openmeteo_dataframe.to_dict('records')
-        # visualcrossing_data = get_visualcrossing_data(region, all_metrics, start_date, end_date)
+            harmonized_dataframe = drop_unchanged_rows(
+                harmonized_dataframe, all_metrics, stored_digests, time_keys.dt.strftime(TIME_FORMAT)
+            )
+            all_data += dataframe_to_records(harmonized_dataframe)
+            changed_dataframes.append((region["id"], harmonized_dataframe))
 
-        # faire fonction qui join les deux sources
-        harmonized_data = openmeteo_data
+    report = save_normalized_data(all_data)
+    if report["rows_written"]:
+        refresh_normalized_data_daily(all_data)
+        result_cache.bump_generation()
 
-        all_data += harmonized_data
+    feature_store.update_ingested(changed_dataframes, report)
 
-    save_normalized_data(all_data)
 
-# update_ingestion()
\ No newline at end of file
+# update_ingestion()
@@ -2,16 +2,15 @@ import numpy as np
 import torch
 from matplotlib import pyplot as plt
 
-from data_api.data.data import get_data_common
-from data_api.lstm.train_all_models import preprocess_train_data
+from data_api.lstm.train_all_models import load_training_set
+from data_api.regions.registry import region_registry
 
 metric = "humidity"
 NBR_ROW_TRAIN = 1000
 NBR_ROW_CHECK = 100
 
 def check_model():
-    data_train = get_data_common(regions=["paris"])
-    x, y = preprocess_train_data(data_train, metric)[:NBR_ROW_TRAIN + NBR_ROW_CHECK]
+    x, y, _ = load_training_set(metric, [region_registry.get_by_name("paris")])
     ((x_train, y_train), (x_checks, y_checks)) = (
         (x[-NBR_ROW_TRAIN:-NBR_ROW_CHECK], y[-NBR_ROW_TRAIN:-NBR_ROW_CHECK]),
         (x[-NBR_ROW_CHECK:], y[-NBR_ROW_CHECK:])
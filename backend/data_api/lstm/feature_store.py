@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_api.mapping.metrics import get_all_metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE_DIR = os.getenv("FEATURE_STORE_DIR", os.path.join(BASE_DIR, '..', 'feature_store'))
+
+# Start of the history synced from Supabase for a region missing from the store
+SYNC_START_DATE = "2025-03-01"
+SYNC_END_DATE = "9999-12-31"
+SYNC_PAGE_SIZE = 1000
+
+FEATURE_DTYPE = np.float32
+TIME_DTYPE = np.int64  # Seconds since epoch, UTC
+
+
+class FeatureStore:
+    """
+    Per-region float32 feature matrices and their timestamps kept in raw
+    memmap files, rows sorted by time:
+
+        <region_id>.features.f32  (rows, len(columns)) float32
+        <region_id>.times.i8      (rows,) int64 epoch seconds
+
+    Files only grow by appending, so readers open them zero-copy with
+    np.memmap and the row count is derived from the file size.
+
+    Nothing touches the disk until the store is first used, so importing the
+    shared instance doesn't create the directory.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, columns=None):
+        self.store_dir = store_dir
+        self.columns = list(columns or get_all_metrics())
+        self.lock = threading.Lock()
+        self.prepare_lock = threading.Lock()
+        self.prepared = False
+
+    def prepare(self):
+        """
+        Creates the directory and checks the manifest on first use.
+        """
+        if self.prepared:
+            return
+        with self.prepare_lock:
+            if not self.prepared:
+                os.makedirs(self.store_dir, exist_ok=True)
+                self.check_manifest()
+                self.prepared = True
+
+    def check_manifest(self):
+        manifest_path = os.path.join(self.store_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as manifest_file:
+                columns = json.load(manifest_file)["columns"]
+            if columns == self.columns:
+                return
+            # Metrics changed, the stored matrices no longer match
+            print(f"Feature store columns changed, clearing {self.store_dir}")
+            for region_id in self.list_region_ids():
+                self.delete_region(region_id)
+
+        with open(manifest_path, "w") as manifest_file:
+            json.dump({"columns": self.columns}, manifest_file)
+
+    def get_paths(self, region_id):
+        return (
+            os.path.join(self.store_dir, f"{region_id}.features.f32"),
+            os.path.join(self.store_dir, f"{region_id}.times.i8")
+        )
+
+    def get_region_ids(self):
+        self.prepare()
+        return self.list_region_ids()
+
+    def list_region_ids(self):
+        return sorted(
+            int(file_name.split(".")[0])
+            for file_name in os.listdir(self.store_dir)
+            if file_name.endswith(".times.i8")
+        )
+
+    def get_row_count(self, region_id):
+        self.prepare()
+        features_path, times_path = self.get_paths(region_id)
+        if not os.path.exists(features_path) or not os.path.exists(times_path):
+            return 0
+        row_size = len(self.columns) * np.dtype(FEATURE_DTYPE).itemsize
+        # An append interrupted between the two files leaves extra rows in one of them
+        return min(
+            os.path.getsize(features_path) // row_size,
+            os.path.getsize(times_path) // np.dtype(TIME_DTYPE).itemsize
+        )
+
+    def has_region(self, region_id):
+        return self.get_row_count(region_id) > 0
+
+    def open_region(self, region_id, mode="r"):
+        """
+        Returns (times, features) memmaps of a region, empty arrays if unknown.
+        """
+        rows = self.get_row_count(region_id)
+        if rows == 0:
+            return np.empty(0, dtype=TIME_DTYPE), np.empty((0, len(self.columns)), dtype=FEATURE_DTYPE)
+
+        features_path, times_path = self.get_paths(region_id)
+        return (
+            np.memmap(times_path, dtype=TIME_DTYPE, mode=mode, shape=(rows,)),
+            np.memmap(features_path, dtype=FEATURE_DTYPE, mode=mode, shape=(rows, len(self.columns)))
+        )
+
+    def delete_region(self, region_id):
+        for path in self.get_paths(region_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write_region(self, region_id, times, features):
+        """
+        Writes rows of a region: hours already stored are overwritten in place
+        (revised forecasts), hours after the last stored one are appended.
+        Anything else, like a backfilled gap, rewrites the region files.
+        """
+        order = np.argsort(times, kind="stable")
+        times = np.asarray(times, dtype=TIME_DTYPE)[order]
+        features = np.ascontiguousarray(np.asarray(features, dtype=FEATURE_DTYPE)[order])
+        # Keeps the last row of duplicated hours
+        keep = np.append(times[1:] != times[:-1], True)
+        times, features = times[keep], features[keep]
+        if len(times) == 0:
+            return
+
+        self.prepare()
+        with self.lock:
+            stored_times, stored_features = self.open_region(region_id, mode="r+")
+            rows = len(stored_times)
+
+            positions = np.searchsorted(stored_times, times)
+            found = positions < rows
+            found[found] = stored_times[positions[found]] == times[found]
+            appended = times > stored_times[-1] if rows else np.ones(len(times), dtype=bool)
+
+            if not np.all(found | appended):
+                merged_times = np.concatenate([np.asarray(stored_times), times])
+                merged_features = np.concatenate([np.asarray(stored_features), features])
+                del stored_times, stored_features
+                self.replace_region(region_id, merged_times, merged_features)
+                return
+
+            if found.any():
+                stored_features[positions[found]] = features[found]
+                stored_features.flush()
+            del stored_times, stored_features
+
+            features_path, times_path = self.get_paths(region_id)
+            if rows:
+                # Drops the leftovers of an interrupted append before writing after them
+                os.truncate(features_path, rows * len(self.columns) * np.dtype(FEATURE_DTYPE).itemsize)
+                os.truncate(times_path, rows * np.dtype(TIME_DTYPE).itemsize)
+            # Row count is the minimum of both files, times are written last
+            with open(features_path, "ab") as features_file:
+                features_file.write(features[appended].tobytes())
+            with open(times_path, "ab") as times_file:
+                times_file.write(times[appended].tobytes())
+
+    def replace_region(self, region_id, times, features):
+        order = np.argsort(times, kind="stable")
+        times, features = times[order], features[order]
+        # On duplicated hours the later write wins
+        keep = np.append(times[1:] != times[:-1], True)
+        times, features = times[keep], features[keep]
+
+        features_path, times_path = self.get_paths(region_id)
+        for path, values in ((features_path, features), (times_path, times)):
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "wb") as temporary_file:
+                temporary_file.write(np.ascontiguousarray(values).tobytes())
+            os.replace(temporary_path, path)
+
+    def write_dataframe(self, region_id, dataframe):
+        """
+        Writes harmonized rows, `time` being a datetime64 column.
+        """
+        times = pd.to_datetime(dataframe["time"]).to_numpy(dtype="datetime64[s]").astype(TIME_DTYPE)
+        features = dataframe.reindex(columns=self.columns).to_numpy(dtype=FEATURE_DTYPE)
+        self.write_region(region_id, times, features)
+
+    def write_records(self, region_id, rows):
+        """
+        Writes rows shaped like normalized_data records.
+        """
+        if not rows:
+            return
+        dataframe = pd.DataFrame(rows)
+        dataframe["time"] = pd.to_datetime(dataframe["time"], utc=True).dt.tz_localize(None)
+        self.write_dataframe(region_id, dataframe)
+
+    def update_ingested(self, changed_dataframes, report):
+        """
+        Writes the (region_id, harmonized dataframe) pairs an ingestion saved
+        with `report`, to the regions already in the store; the others are
+        synced in full the first time a model needs them.
+        """
+        for region_id, dataframe in changed_dataframes:
+            if not self.has_region(region_id):
+                continue
+            if report["rows_failed"]:
+                # Which rows failed isn't known, the region is synced again from Supabase
+                self.delete_region(region_id)
+            else:
+                self.write_dataframe(region_id, dataframe)
+
+    def sync_region(self, region):
+        """
+        Fills a region missing from the store with its whole history from Supabase.
+        """
+        from data_api.data.data import iter_pages
+        from data_api.supabase.database import load_normalized_data_page
+
+        rows = list(iter_pages(lambda page_key: load_normalized_data_page(
+            SYNC_START_DATE, SYNC_END_DATE, [region["name"]], self.columns, SYNC_PAGE_SIZE, page_key
+        )))
+        print(f"Feature store: synced {len(rows)} rows of {region['name']}")
+        self.write_records(region["id"], rows)
+
+    def ensure_regions(self, regions):
+        for region in regions:
+            if not self.has_region(region["id"]):
+                self.sync_region(region)
+
+    def load_regions(self, regions):
+        """
+        Returns the (times, features) memmaps of each region, syncing the
+        regions that aren't stored yet.
+        """
+        self.ensure_regions(regions)
+        return [self.open_region(region["id"]) for region in regions]
+
+
+# Shared store instance
+feature_store = FeatureStore()
@@ -1,7 +1,8 @@
+import copy
 import os
-import random
-from math import ceil
+import time
 
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -10,7 +11,19 @@ import matplotlib.pyplot as plt
 
 from data_api.lstm.model import LSTMModel
 
-NUMBER_EPOCHS = 10
+# Rows per input window, the next row being the target
+PACKET_SIZE = 8
+
+NUMBER_EPOCHS = int(os.getenv("TRAIN_EPOCHS", 10))
+BATCH_SIZE = int(os.getenv("TRAIN_BATCH_SIZE", 256))
+# Threads used by torch ops in this process, 0 keeps the torch default
+NUM_THREADS = int(os.getenv("TRAIN_NUM_THREADS", 0))
+# DataLoader worker processes, 0 loads batches in the training process
+NUM_WORKERS = int(os.getenv("TRAIN_NUM_WORKERS", 0))
+# Epochs without validation improvement before training stops
+PATIENCE = int(os.getenv("TRAIN_PATIENCE", 3))
+VALIDATION_SPLIT = 0.1
+LEARNING_RATE = 0.0005
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def check_path_model():
@@ -20,32 +33,106 @@ def check_path_model():
     return base_model_path
 
 
-def train_ai(X, y, metric, plot=False):
-    base_model_path = check_path_model()
-
-    global LAST_EPOCH_RESULT
-
-    x_tensor = torch.tensor(X, dtype=torch.float32)  # [batch, seq_len, 1]
-    y_tensor = torch.tensor(y, dtype=torch.float32) # [batch, 1]
-
-    dataset = TensorDataset(x_tensor, y_tensor)
-    dataloader = DataLoader(dataset, batch_size=1, shuffle=False)
+def get_complete_windows_mask(X, y=None):
+    """
+    True for the windows (and targets) without missing values.
+    """
+    complete = ~np.isnan(X).any(axis=(1, 2))
+    if y is not None:
+        complete &= ~np.isnan(y).any(axis=1)
+    return complete
+
+
+def split_train_validation(X, y, window_counts=None, validation_split=VALIDATION_SPLIT):
+    """
+    Holds out the chronological tail of each region's windows for validation
+    and returns contiguous float32 tensors, windows with missing values dropped.
+    Consecutive windows share rows, so the PACKET_SIZE windows before each tail
+    are dropped too: no validation row is ever seen in training.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    window_counts = window_counts if window_counts is not None else [len(X)]
+
+    train_indices = []
+    validation_indices = []
+    start = 0
+    for count in window_counts:
+        validation_size = int(count * validation_split)
+        validation_start = start + count - validation_size
+        train_indices.append(np.arange(start, max(start, validation_start - PACKET_SIZE)))
+        validation_indices.append(np.arange(validation_start, start + count))
+        start += count
+
+    valid = get_complete_windows_mask(X, y)
+    train_indices = np.concatenate(train_indices)
+    validation_indices = np.concatenate(validation_indices)
+    train_indices = train_indices[valid[train_indices]]
+    validation_indices = validation_indices[valid[validation_indices]]
+
+    # Fancy indexing copies, each tensor is one contiguous block shared with numpy
+    return (
+        (torch.from_numpy(X[train_indices]), torch.from_numpy(y[train_indices])),
+        (torch.from_numpy(X[validation_indices]), torch.from_numpy(y[validation_indices]))
+    )
+
+
+def evaluate(model, x_tensor, y_tensor, criterion, batch_size):
+    model.eval()
+    loss_sum = 0.0
+    mae_sum = 0.0
+    with torch.inference_mode():
+        for index in range(0, len(x_tensor), batch_size):
+            xb, yb = x_tensor[index:index + batch_size], y_tensor[index:index + batch_size]
+            output = model(xb)
+            loss_sum += criterion(output, yb).item() * len(xb)
+            mae_sum += torch.abs(output - yb).sum().item()
+    return loss_sum / len(x_tensor), mae_sum / len(x_tensor)
+
+
+def train_ai(X, y, metric, plot=False, batch_size=BATCH_SIZE, shuffle=True, num_threads=NUM_THREADS,
+             num_workers=NUM_WORKERS, epochs=NUMBER_EPOCHS, patience=PATIENCE, model_path=None, window_counts=None):
+    """
+    Trains the metric model with mini-batches and early stopping on the
+    chronological tail of each region (`window_counts` windows per region, in
+    order; a single series when omitted). The best epoch is saved to
+    `model_path` (models/<metric>.pt by default) and a summary of the run is returned.
+    """
+    model_path = model_path or os.path.join(check_path_model(), f"{metric}.pt")
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    (x_train, y_train), (x_validation, y_validation) = split_train_validation(X, y, window_counts)
+    if len(x_train) == 0:
+        raise ValueError(f"No training window without missing values for {metric}")
+    if len(x_validation) == 0:
+        # Too few windows to hold some out, the training set is used for validation
+        x_validation, y_validation = x_train, y_train
+
+    dataloader = DataLoader(
+        TensorDataset(x_train, y_train),
+        batch_size=batch_size,
+        shuffle=shuffle,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0
+    )
 
     model = LSTMModel()
     criterion = nn.MSELoss()
-    optimizer = optim.Adam(model.parameters(), lr=0.0005)
+    optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
 
     # Metrics tracking
     epoch_losses = []
     epoch_maes = []
     best_loss = float('inf')
     best_epoch = -1
-    best_pred = None
+    best_state = None
+    samples_per_second = []
 
-    for epoch in range(NUMBER_EPOCHS):
+    for epoch in range(epochs):
         model.train()
         running_loss = 0.0
-        running_mae = 0.0
+        started_at = time.perf_counter()
 
         for xb, yb in dataloader:
             optimizer.zero_grad()
@@ -54,46 +141,55 @@ def train_ai(X, y, metric, plot=False):
             loss.backward()
             optimizer.step()
 
-            running_loss += loss.item()
-            running_mae += torch.abs(output - yb).mean().item()
+            running_loss += loss.item() * len(xb)
+
+        epoch_duration = time.perf_counter() - started_at
+        samples_per_second.append(len(x_train) / epoch_duration)
+
+        train_loss = running_loss / len(x_train)
+        validation_loss, validation_mae = evaluate(model, x_validation, y_validation, criterion, batch_size)
+        epoch_losses.append(validation_loss)
+        epoch_maes.append(validation_mae)
 
-        avg_loss = running_loss / len(dataloader)
-        avg_mae = running_mae / len(dataloader)
-        epoch_losses.append(avg_loss)
-        epoch_maes.append(avg_mae)
+        print(
+            f"Epoch {epoch + 1} - Loss: {train_loss:.4f} | Validation loss: {validation_loss:.4f} "
+            f"| Validation MAE: {validation_mae:.4f} | {samples_per_second[-1]:.0f} samples/s"
+        )
 
         # Save best epoch
-        if avg_loss < best_loss:
-            best_loss = avg_loss
+        if validation_loss < best_loss:
+            best_loss = validation_loss
             best_epoch = epoch + 1
+            best_state = copy.deepcopy(model.state_dict())
+            torch.save(model, model_path)
+        elif epoch + 1 - best_epoch >= patience:
+            print(f"Early stopping at epoch {epoch + 1}, best epoch {best_epoch}")
+            break
 
-        # Epoch prediction logging
-        model.eval()
-        with torch.no_grad():
-            index = random.randint(0, len(y_tensor) - 1)
-            index2 = random.randint(0, len(y_tensor) - 1)
-            index3 = random.randint(0, len(y_tensor) - 1)
-            pred = model(x_tensor[index].unsqueeze(0)).item()
-            pred2 = model(x_tensor[index2].unsqueeze(0)).item()
-            pred3 = model(x_tensor[index3].unsqueeze(0)).item()
-            print(f"Epoch {epoch + 1} - Loss: {avg_loss:.4f} | MAE: {avg_mae:.4f} | Predicted: {pred:.2f} | Expected: {y_tensor[index].item():.2f}")
-            print(f"Epoch {epoch + 1} - Loss: {avg_loss:.4f} | MAE: {avg_mae:.4f} | Predicted: {pred2:.2f} | Expected: {y_tensor[index2].item():.2f}")
-            print(f"Epoch {epoch + 1} - Loss: {avg_loss:.4f} | MAE: {avg_mae:.4f} | Predicted: {pred3:.2f} | Expected: {y_tensor[index3].item():.2f}")
-
-    # Save model
-    torch.save(model, os.path.join(base_model_path, f"{metric}.pt"))
+    if best_state is None:
+        raise ValueError(f"No epoch improved the validation loss of {metric}, no checkpoint was saved")
+    model.load_state_dict(best_state)
 
     if plot:
         plot_model_training(epoch_losses, epoch_maes, best_epoch)
 
-    return
+    return {
+        "metric": metric,
+        "model_path": model_path,
+        "best_epoch": best_epoch,
+        "epochs": len(epoch_losses),
+        "validation_loss": best_loss,
+        "validation_mae": epoch_maes[best_epoch - 1],
+        "train_samples": len(x_train),
+        "samples_per_second": sum(samples_per_second) / len(samples_per_second)
+    }
 
 
 def plot_model_training(epoch_losses, epoch_maes, best_epoch):
     plt.figure(figsize=(12, 5))
 
     plt.subplot(1, 2, 1)
-    plt.plot(epoch_losses, label='MSE Loss')
+    plt.plot(epoch_losses, label='Validation MSE Loss')
     plt.axvline(best_epoch - 1, color='red', linestyle='--', label='Best Epoch')
     plt.title('Loss per Epoch')
     plt.xlabel('Epoch')
@@ -101,7 +197,7 @@ def plot_model_training(epoch_losses, epoch_maes, best_epoch):
     plt.legend()
 
     plt.subplot(1, 2, 2)
-    plt.plot(epoch_maes, label='MAE')
+    plt.plot(epoch_maes, label='Validation MAE')
     plt.axvline(best_epoch - 1, color='red', linestyle='--', label='Best Epoch')
     plt.title('MAE per Epoch')
     plt.xlabel('Epoch')
@@ -1,64 +1,186 @@
-from datetime import datetime
-from functools import reduce
-from itertools import pairwise
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
 
 import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
-from data_api.data.data import get_data_common
-from data_api.lstm.train import train_ai
+from data_api.lstm.feature_store import feature_store
+from data_api.lstm.train import PACKET_SIZE, check_path_model, get_complete_windows_mask, train_ai
 from data_api.mapping.metrics import get_all_metrics
+from data_api.regions.registry import region_registry
 
-PACKET_SIZE = 8
+# Training processes, 0 uses one per CPU core (capped by the number of models)
+TRAIN_MAX_WORKERS = int(os.getenv("TRAIN_MAX_WORKERS", 0))
 
-def preprocess_train_data(data, metric):
-    exclusion_list = ["time", "region_id", "region"]
-    sorted_data = sorted(data, key=lambda x: (x["region_id"], x["time"]))
-    index_metric = list(filter(
-        lambda x: x not in exclusion_list,
-        data[0].keys()
-    )).index(metric)
-
-    features_data = [
-        [
-            *[value for key, value in row.items() if key not in exclusion_list]
-        ]
-        for row in sorted_data
-    ]
+EXCLUDED_COLUMNS = ["time", "region_id", "region"]
+
+
+def get_feature_matrices(data):
+    """
+    Returns the feature column names and one contiguous float32 matrix per
+    region, rows sorted by time. Missing values become NaN.
+    """
+    feature_columns = [key for key in data[0].keys() if key not in EXCLUDED_COLUMNS]
+    df = pd.DataFrame(data, columns=["region_id", "time", *feature_columns])
+    df = df.sort_values(["region_id", "time"], kind="stable")
+
+    features = df[feature_columns].to_numpy(dtype=np.float32)
+    region_ids = df["region_id"].to_numpy()
+    boundaries = np.flatnonzero(region_ids[1:] != region_ids[:-1]) + 1
+
+    return feature_columns, np.split(features, boundaries)
+
+
+def build_windows(features, index_metric):
+    """
+    Windows of PACKET_SIZE + 1 consecutive rows over a single region. The
+    windows and y are views on `features`; only the normalized X is allocated.
+    """
+    # (windows, features, PACKET_SIZE + 1) -> (windows, PACKET_SIZE + 1, features)
+    windows = sliding_window_view(features, PACKET_SIZE + 1, axis=0).transpose(0, 2, 1)
 
-    diff_indexes = [0] + [
-        index
-        for (index, (left, right)) in enumerate(pairwise(sorted_data))
-        if left["region_id"] != right["region_id"]
-    ] + [len(sorted_data) - 1]
+    # Scaled on the input rows only, like build_prediction_input, so X doesn't leak y
+    X = min_max_normalize(windows[:, :PACKET_SIZE])
+    y = windows[:, PACKET_SIZE:, index_metric]
 
-    regions_index_tuple = [(left, right - PACKET_SIZE) for (left, right) in pairwise(diff_indexes)]
+    return X, y
 
-    features_data_no_cross_region = reduce(lambda x, y: x + y, [features_data[left:right] for left, right in regions_index_tuple])
 
-    transformed_data_packets = [
-        np.array(features_data_no_cross_region[index_left: index_left + (PACKET_SIZE + 1)])
-        for index_left in range(len(features_data_no_cross_region) - (PACKET_SIZE + 1))
+def build_training_set(region_features, index_metric):
+    """
+    Concatenates the windows of every region, windows never span two regions.
+    Also returns the number of windows of each region, in order, so callers can
+    split each region's series chronologically.
+    """
+    region_windows = [
+        build_windows(features, index_metric)
+        for features in region_features
+        if len(features) > PACKET_SIZE
     ]
+    if not region_windows:
+        features_count = region_features[0].shape[1] if region_features else 0
+        return (
+            np.empty((0, PACKET_SIZE, features_count), dtype=np.float32),
+            np.empty((0, 1), dtype=np.float32),
+            []
+        )
 
-    transformed_data_normalized = [min_max_normalize(data) for data in transformed_data_packets]
+    X = np.concatenate([X for X, _ in region_windows])
+    y = np.concatenate([y for _, y in region_windows])
 
-    X, _ = np.split(np.array(transformed_data_normalized), [PACKET_SIZE], axis=1)
-    _, y = np.split(np.array(transformed_data_packets), [PACKET_SIZE], axis=1)
+    return X, y, [len(X) for X, _ in region_windows]
 
-    y = y[:,:,index_metric]
 
+def preprocess_train_data(data, metric):
+    feature_columns, region_features = get_feature_matrices(data)
+    X, y, _ = build_training_set(region_features, feature_columns.index(metric))
     return X, y
 
+
+def load_training_set(metric, regions=None):
+    """
+    Builds X/y and the per-region window counts from the feature store
+    memmaps instead of downloading the history.
+    """
+    regions = regions if regions is not None else region_registry.all()
+    region_features = [features for _, features in feature_store.load_regions(regions)]
+    return build_training_set(region_features, feature_store.columns.index(metric))
+
+
+def build_prediction_input(features):
+    """
+    Normalized window of the last PACKET_SIZE rows, the input predicting the next hour.
+    """
+    return min_max_normalize(np.asarray(features[-PACKET_SIZE:], dtype=np.float32))
+
 def min_max_normalize(arr):
-    min_vals = arr.min(axis=0)
-    max_vals = arr.max(axis=0)
+    # Normalizes each window (axis -2) independently
+    min_vals = arr.min(axis=-2, keepdims=True)
+    max_vals = arr.max(axis=-2, keepdims=True)
     return (arr - min_vals) / (max_vals - min_vals + 1e-8)
 
-def train_all_models():
-    all_metrics = get_all_metrics()
-    data_train = get_data_common()
-    for metric in all_metrics[2:3]:
-        X, y = preprocess_train_data(data_train, metric)
-        train_ai(X, y, metric)
-
-# train_all_models()
\ No newline at end of file
+def get_model_path(metric, region=None):
+    """
+    models/<metric>.pt, or models/regions/<region_id>/<metric>.pt for a per-region model.
+    """
+    base_model_path = check_path_model()
+    if region is None:
+        return os.path.join(base_model_path, f"{metric}.pt")
+
+    region_model_path = os.path.join(base_model_path, "regions", str(region["id"]))
+    os.makedirs(region_model_path, exist_ok=True)
+    return os.path.join(region_model_path, f"{metric}.pt")
+
+
+def train_model_job(metric, regions, region, num_threads):
+    """
+    Trains one model in a worker process, on every region or a single one.
+    """
+    started_at = time.perf_counter()
+    X, y, window_counts = load_training_set(metric, [region] if region is not None else regions)
+    summary = train_ai(
+        X, y, metric, num_threads=num_threads, model_path=get_model_path(metric, region), window_counts=window_counts
+    )
+    summary["training_seconds"] = round(time.perf_counter() - started_at, 3)
+    return summary
+
+
+def train_all_models(metrics=None, per_region=False, max_workers=TRAIN_MAX_WORKERS, manifest_path=None):
+    """
+    Trains one model per metric, and per region when per_region is set, in a
+    process pool. The CPU threads are split between the workers, and a manifest
+    of the model files, training time and validation error is written at the end.
+    """
+    metrics = metrics or get_all_metrics()
+    regions = region_registry.all()
+    # Synced once here so workers only read the memmaps
+    feature_store.ensure_regions(regions)
+
+    jobs = [
+        (metric, region)
+        for metric in metrics
+        for region in (regions if per_region else [None])
+    ]
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    num_threads = max(1, (os.cpu_count() or 1) // max_workers)
+    print(f"Training {len(jobs)} models on {max_workers} processes x {num_threads} threads")
+
+    started_at = time.perf_counter()
+    entries = []
+    # spawn, the server process forking with its scheduler threads isn't safe
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(train_model_job, metric, regions, region, num_threads): (metric, region)
+            for metric, region in jobs
+        }
+        for future in as_completed(futures):
+            metric, region = futures[future]
+            entry = {"metric": metric, "region_id": region["id"] if region is not None else None}
+            try:
+                entry.update(future.result())
+            except Exception as e:
+                print(f"Training failed for {metric}{' / ' + region['name'] if region else ''}: {e}")
+                entry["error"] = str(e)
+            entries.append(entry)
+
+    manifest = {
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "per_region": per_region,
+        "processes": max_workers,
+        "threads_per_process": num_threads,
+        "total_seconds": round(time.perf_counter() - started_at, 3),
+        "models": sorted(entries, key=lambda entry: (entry["metric"], entry["region_id"] or 0))
+    }
+    manifest_path = manifest_path or os.path.join(check_path_model(), "manifest.json")
+    with open(manifest_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    print(f"Training manifest written to {manifest_path}")
+
+    return manifest
+
+# train_all_models()
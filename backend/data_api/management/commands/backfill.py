@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from data_api.ingestion.backfill import (
+    BACKFILL_MAX_WORKERS, BACKFILL_REQUESTS_PER_SECOND, DEFAULT_STATE_FILE, run_backfill
+)
+
+
+class Command(BaseCommand):
+    help = "Backfill normalized_data per (region, month) on a worker pool, resuming from the state file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 3, 1), help="YYYY-MM-DD")
+        parser.add_argument('--end', type=date.fromisoformat, default=None, help="YYYY-MM-DD, defaults to today")
+        parser.add_argument('--workers', type=int, default=BACKFILL_MAX_WORKERS)
+        parser.add_argument('--rate', type=float, default=BACKFILL_REQUESTS_PER_SECOND, help="Provider requests per second")
+        parser.add_argument('--state-file', default=DEFAULT_STATE_FILE)
+
+    def handle(self, *args, **options):
+        if options['end'] and options['start'] > options['end']:
+            raise CommandError("Start date can't be superior to end date.")
+
+        failed_units = run_backfill(
+            options['start'],
+            options['end'],
+            state_file=options['state_file'],
+            max_workers=options['workers'],
+            requests_per_second=options['rate']
+        )
+        if failed_units:
+            raise CommandError(f"{len(failed_units)} units failed, run the command again to resume")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from data_api.lstm.train_all_models import TRAIN_MAX_WORKERS, train_all_models
+from data_api.mapping.metrics import get_all_metrics
+
+
+class Command(BaseCommand):
+    help = "Train one LSTM model per metric (and optionally per region) on a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--metrics', nargs='+', default=None, help="Defaults to every metric")
+        parser.add_argument('--per-region', action='store_true', help="Train one model per (metric, region)")
+        parser.add_argument('--workers', type=int, default=TRAIN_MAX_WORKERS, help="0 uses one process per CPU core")
+        parser.add_argument('--manifest', default=None, help="Defaults to models/manifest.json")
+
+    def handle(self, *args, **options):
+        invalid_metrics = set(options['metrics'] or []) - set(get_all_metrics())
+        if invalid_metrics:
+            raise CommandError(f"Unknown metric(s): {', '.join(invalid_metrics)}")
+
+        manifest = train_all_models(
+            metrics=options['metrics'],
+            per_region=options['per_region'],
+            max_workers=options['workers'],
+            manifest_path=options['manifest']
+        )
+        failed_models = [entry for entry in manifest["models"] if "error" in entry]
+        if failed_models:
+            raise CommandError(f"{len(failed_models)} models failed to train")
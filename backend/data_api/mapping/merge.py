@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["region_id", "time"]
+
+# First source with a value wins, unless the metric is averaged
+SOURCE_PRECEDENCE = ["openmeteo", "visualcrossing"]
+
+# Per-metric conflict resolution: "precedence" (default) or "average".
+# Pressure isn't averaged: Open-Meteo reports surface pressure, Visual Crossing sea level.
+MERGE_STRATEGIES = {
+    "temperature": "average",
+    "apparent_temperature": "average",
+    "humidity": "average",
+    "dew_point": "average"
+}
+
+
+def merge_sources(frames_by_source, metrics, precedence=SOURCE_PRECEDENCE, strategies=MERGE_STRATEGIES):
+    """
+    Aligns harmonized DataFrames of several providers on (region_id, time)
+    and resolves each metric column-wise with its strategy. Missing sources
+    or values are skipped, so a provider outage degrades to the others.
+    """
+    sources = [source for source in precedence if frames_by_source.get(source) is not None]
+    if not sources:
+        raise ValueError("No source to merge")
+    if len(sources) == 1:
+        return frames_by_source[sources[0]]
+
+    indexed = {source: frames_by_source[source].set_index(KEY_COLUMNS) for source in sources}
+    index = indexed[sources[0]].index
+    for source in sources[1:]:
+        index = index.union(indexed[source].index)
+    aligned = {source: frame.reindex(index) for source, frame in indexed.items()}
+
+    merged = {}
+    for metric in metrics:
+        # One column per source, in precedence order
+        values = np.column_stack([
+            aligned[source][metric].to_numpy(dtype=np.float32, na_value=np.nan)
+            if metric in aligned[source] else np.full(len(index), np.nan, dtype=np.float32)
+            for source in sources
+        ])
+        if strategies.get(metric) == "average":
+            available = ~np.isnan(values)
+            counts = available.sum(axis=1)
+            sums = np.where(available, values, 0).sum(axis=1)
+            merged[metric] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan).astype(np.float32)
+        else:
+            first_available = np.argmax(~np.isnan(values), axis=1)
+            merged[metric] = values[np.arange(len(index)), first_available]
+
+    return pd.DataFrame(merged, index=index).reset_index()
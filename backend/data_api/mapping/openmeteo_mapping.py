@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from data_api.mapping.common import list_to_string_api
@@ -32,25 +33,31 @@ def map_to_common_data(openmeteo_data):
     common_data["latitude"] = openmeteo_data["latitude"]
     common_data["longitude"] = openmeteo_data["longitude"]
     common_data["unit"] = openmeteo_data["hourly_units"]["temperature_2m"]
+
+    hourly = openmeteo_data["hourly"]
+    common_metrics = [openmeteo_to_common_mapping[key] for key in hourly if key != "time"]
+    series = [values for key, values in hourly.items() if key != "time"]
+    # One pass over the hours, zipping every series instead of indexing them per hour
     common_data["data"] = [
-        {
-            "time": openmeteo_data["hourly"]["time"][index],
-            "data": {
-                openmeteo_to_common_mapping[key]:
-                    value[index] for key, value in filter(lambda x: x[0] != "time", openmeteo_data["hourly"].items())
-            }
-        }
-        for index in range(len(openmeteo_data["hourly"]["time"]))
+        {"time": time, "data": dict(zip(common_metrics, values))}
+        for time, *values in zip(hourly["time"], *series)
     ]
 
     return common_data
 
 
 def convert_to_harmonized_df(openmeteo_data, region):
+    """
+    Columnar DataFrame of one location: float32 metric columns (missing values
+    as NaN), `time` parsed once to naive UTC datetime64 and `region_id`.
+    """
     data = openmeteo_data["hourly"]
-    harminzed_data = {common_metric: data[openmeteo_metric] for openmeteo_metric, common_metric in openmeteo_to_common_mapping.items()}
+    harmonized_data = {
+        common_metric: np.asarray(data[openmeteo_metric], dtype=np.float32)
+        for openmeteo_metric, common_metric in openmeteo_to_common_mapping.items()
+    }
 
-    df = pd.DataFrame(harminzed_data)
-    df['time'] = data["time"]
+    df = pd.DataFrame(harmonized_data)
+    df['time'] = pd.to_datetime(data["time"], utc=True).tz_localize(None)
     df['region_id'] = region["id"]
-    return df
\ No newline at end of file
+    return df
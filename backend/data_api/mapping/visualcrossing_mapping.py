@@ -1,12 +1,15 @@
+import numpy as np
 import pandas as pd
 
+from data_api.mapping.common import list_to_string_api
+
 visualcrossing_to_common_mapping = {
     "temp": "temperature",
     "feelslike": "apparent_temperature",
     "humidity": "humidity",
     "dew": "dew_point",
-    "Precipitation Probability": "precipitation_probability",
-    "Precipitation (rain + showers + snow)": "precipitation",
+    "precipprob": "precipitation_probability",
+    "precip": "precipitation",
     "snow": "snow",
     "snowdepth": "snow_depth",
     "windgust": "wind_gust",
@@ -14,11 +17,20 @@ visualcrossing_to_common_mapping = {
     "winddir": "wind_direction",
     "pressure": "pressure",
     "visibility": "visibility",
-    "cloud_cover": "cloud_cover"
+    "cloudcover": "cloud_cover"
 }
 
 common_to_visualcrossing_mapping = {v: k for k, v in visualcrossing_to_common_mapping.items()}
 
+# Factors from Visual Crossing metric units to Open-Meteo's (km -> m, cm -> m)
+visualcrossing_unit_conversions = {
+    "visibility": 1000,
+    "snow_depth": 0.01
+}
+
+def convert_common_metrics_to_api_string(metrics):
+    return list_to_string_api(["datetimeEpoch"] + [common_to_visualcrossing_mapping[metric] for metric in metrics])
+
 def map_to_common_data(visualcrossing_data):
     common_data = {}
     common_data["latitude"] = visualcrossing_data["latitude"]
@@ -38,9 +50,22 @@ def map_to_common_data(visualcrossing_data):
     return common_data
 
 
-def convert_to_df(visualcrossing_data):
-    pass
-    # df = pd.DataFrame(visualcrossing_data)
-    # df['time'] = pd.to_datetime(df['time'])
-    # return df
+def convert_to_df(visualcrossing_data, region):
+    """
+    Same columns as openmeteo_mapping.convert_to_harmonized_df: float32 metrics
+    in Open-Meteo units, `time` as naive UTC datetime64 and `region_id`.
+    """
+    hours = [hour for day in visualcrossing_data["days"] for hour in day.get("hours", [])]
+    records = pd.DataFrame.from_records(hours)
 
+    df = pd.DataFrame({
+        common_metric: (
+            records[visualcrossing_metric].to_numpy(dtype=np.float32, na_value=np.nan)
+            if visualcrossing_metric in records else np.full(len(records), np.nan, dtype=np.float32)
+        ) * np.float32(visualcrossing_unit_conversions.get(common_metric, 1))
+        for visualcrossing_metric, common_metric in visualcrossing_to_common_mapping.items()
+    })
+    # datetimeEpoch is in UTC, unlike the local `datetime` of each hour
+    df['time'] = pd.to_datetime(records["datetimeEpoch"] if len(records) else [], unit="s")
+    df['region_id'] = region["id"]
+    return df
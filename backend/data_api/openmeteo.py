@@ -1,19 +1,55 @@
-import requests
+import os
 
+from data_api.cache.response_cache import get_provider_json
 from data_api.mapping.openmeteo_mapping import convert_common_metrics_to_api_string, convert_to_harmonized_df
 
+# Overridable to point ingestion at a local stub server
+OPENMETEO_BASE_URL = os.getenv("OPENMETEO_BASE_URL", "https://api.open-meteo.com")
+# Locations per multi-coordinate request, bounded to keep URLs short
+OPENMETEO_BATCH_SIZE = int(os.getenv("OPENMETEO_BATCH_SIZE", 50))
+
 
 def get_openmeteo_data(region, metrics, start_date, end_date):
     latitude, longitude = region["latitude"], region["longitude"]
     openapi_metrics = convert_common_metrics_to_api_string(metrics)
 
-    url = f"https://api.open-meteo.com/v1/forecast?latitude={latitude}&longitude={longitude}&start_date={start_date}&end_date={end_date}&hourly={openapi_metrics}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        harmonized_dataframe = convert_to_harmonized_df(data, region)
-        return harmonized_dataframe
-    else:
-        raise Exception(f"Error: {response.status_code}, {response.text}")
+    url = f"{OPENMETEO_BASE_URL}/v1/forecast"
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": start_date,
+        "end_date": end_date,
+        "hourly": openapi_metrics
+    }
+    data = get_provider_json(url, params, end_date, provider="openmeteo")
+    harmonized_dataframe = convert_to_harmonized_df(data, region)
+    return harmonized_dataframe
+
+
+def chunk_regions(regions, size=OPENMETEO_BATCH_SIZE):
+    return [regions[index:index + size] for index in range(0, len(regions), size)]
+
+
+def get_openmeteo_data_batch(regions, metrics, start_date, end_date):
+    """
+    Fetches several regions sharing the same date range in one request using
+    Open-Meteo's comma-separated coordinates. Returns one harmonized DataFrame
+    per region, in the order of regions.
+    """
+    openapi_metrics = convert_common_metrics_to_api_string(metrics)
 
+    url = f"{OPENMETEO_BASE_URL}/v1/forecast"
+    params = {
+        "latitude": ",".join(str(region["latitude"]) for region in regions),
+        "longitude": ",".join(str(region["longitude"]) for region in regions),
+        "start_date": start_date,
+        "end_date": end_date,
+        "hourly": openapi_metrics
+    }
+    data = get_provider_json(url, params, end_date, provider="openmeteo")
+    # A single location comes back as an object instead of a list
+    locations = data if isinstance(data, list) else [data]
+    if len(locations) != len(regions):
+        raise Exception(f"Error: expected {len(regions)} locations, got {len(locations)}")
 
+    return [convert_to_harmonized_df(location, region) for location, region in zip(locations, regions)]
@@ -0,0 +1,34 @@
+from urllib.parse import urlencode
+
+# Filters of a paginated data query, as (name, many)
+PAGINATION_PARAMS = [
+    ("regions", True),
+    ("metrics", True),
+    ("start", False),
+    ("end", False),
+    ("limit", False),
+    ("resolution", False),
+    ("aggregate", False)
+]
+
+
+def build_next_query(get_param, cursor, extra_params=()):
+    """
+    Query string of the next page. Filters are read with get_param(name, many),
+    so the ones sent in the request body are carried over too; extra_params
+    are other (name, value) query parameters to keep, like `format`.
+    """
+    params = []
+    for name, many in PAGINATION_PARAMS:
+        value = get_param(name, many)
+        if value is None or value == "" or value == []:
+            continue
+        if many:
+            params += [(name, item) for item in (value if isinstance(value, (list, tuple)) else [value])]
+        else:
+            params.append((name, value))
+
+    filter_names = {name for name, _ in PAGINATION_PARAMS}
+    params += [(name, value) for name, value in extra_params if name not in filter_names and name != "cursor"]
+    params.append(("cursor", cursor))
+    return urlencode(params)
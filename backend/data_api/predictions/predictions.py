@@ -1,12 +1,14 @@
 import os
-from datetime import date, datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import torch
 
-from data_api.data.data import get_data_common
-from data_api.lstm.train_all_models import PACKET_SIZE, preprocess_train_data
-from data_api.mapping.metrics import get_all_metrics
-from data_api.supabase.database import load_regions, get_latest_timestamp_by_cities, merge_upsert_prediction
+from data_api.cache.result_cache import result_cache
+from data_api.lstm.feature_store import feature_store
+from data_api.lstm.train_all_models import PACKET_SIZE, build_prediction_input, get_complete_windows_mask
+from data_api.regions.registry import region_registry
+from data_api.supabase.database import merge_upsert_prediction
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -22,32 +24,42 @@ PREDICTION_METRICS = ["temperature"]
 def write_predictions():
     base_model_path = check_path_model()
 
-    all_metrics = get_all_metrics()
-    all_regions = load_regions()
-    latest_timestamp_by_cities = get_latest_timestamp_by_cities()
+    all_regions = region_registry.all()
+    region_stores = feature_store.load_regions(all_regions)
 
-    for metric in PREDICTION_METRICS:
-        model = torch.load(os.path.join(base_model_path, f"{metric}.pt"))
+    # Regions with a full window, predicted together in a single batch
+    ready_regions = []
+    x_predictions = []
+    prediction_timestamps = []
+    for region, (times, features) in zip(all_regions, region_stores):
+        if len(features) < PACKET_SIZE:
+            print(f"Not enough data to predict {region['name']}")
+            continue
 
-        for region in all_regions:
-            latest_timestamp = next(filter(
-                lambda x: x["region_id"] == region["id"],
-                latest_timestamp_by_cities
-            ), None)["latest_time"]
+        x_prediction = build_prediction_input(features)
+        # Same mask as training: a gap in the last hours would predict NaN, which isn't valid JSON
+        if not get_complete_windows_mask(x_prediction[np.newaxis])[0]:
+            print(f"Missing values in the last {PACKET_SIZE} hours of {region['name']}, prediction skipped")
+            continue
 
+        latest_timestamp = datetime.fromtimestamp(int(times[-1]), timezone.utc).replace(tzinfo=None)
+        ready_regions.append(region)
+        x_predictions.append(x_prediction)
+        prediction_timestamps.append((latest_timestamp + timedelta(hours=1)).isoformat())
 
-            prediction_timestamp = (datetime.fromisoformat(latest_timestamp) + timedelta(hours=1)).isoformat()
+    if not ready_regions:
+        return
 
-            known_data = sorted(
-                get_data_common([region["name"]], None, None,  None),
-                key=lambda x: x["time"],
-            )
-            known_data = known_data + [known_data[len(known_data) - 1]]
-            preprocessed_data, _ = preprocess_train_data(known_data, metric)
-            x_prediction = preprocessed_data[len(preprocessed_data) - 1]
+    x_batch = torch.from_numpy(np.stack(x_predictions))
 
-            y_prediction = model(torch.tensor(x_prediction, dtype=torch.float32).unsqueeze(0)).item()
+    for metric in PREDICTION_METRICS:
+        model = torch.load(os.path.join(base_model_path, f"{metric}.pt"))
+        # Dropout off, no autograd bookkeeping
+        model.eval()
+        with torch.inference_mode():
+            y_predictions = model(x_batch).squeeze(1).tolist()
 
+        for region, prediction_timestamp, y_prediction in zip(ready_regions, prediction_timestamps, y_predictions):
             prediction = {
                 "time": prediction_timestamp,
                 "region_id": region["id"],
@@ -56,7 +68,7 @@ def write_predictions():
 
             merge_upsert_prediction(prediction)
 
-
+    result_cache.bump_generation()
 
 
 # write_predictions()
\ No newline at end of file
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+REGION_REGISTRY_TTL_SECONDS = int(os.getenv("REGION_REGISTRY_TTL_SECONDS", 600))
+# Minimum delay between two reloads triggered by unknown names
+REGION_REGISTRY_MISS_REFRESH_SECONDS = int(os.getenv("REGION_REGISTRY_MISS_REFRESH_SECONDS", 30))
+
+
+class RegionSnapshot(namedtuple("RegionSnapshot", ["regions", "names", "by_name", "by_id", "loaded_at"])):
+    """
+    One immutable load of the region table. The registry swaps whole
+    snapshots, readers take one and use only it.
+    """
+
+    @classmethod
+    def build(cls, regions, loaded_at):
+        return cls(
+            regions=regions,
+            names=[region["name"].lower() for region in regions],
+            by_name={region["name"].lower(): region for region in regions},
+            by_id={region["id"]: region for region in regions},
+            loaded_at=loaded_at
+        )
+
+
+class RegionRegistry:
+    """
+    In-memory copy of the `region` table with O(1) name -> row and id -> row
+    lookups. Loaded on first use, reloaded once the TTL expired, on an unknown
+    name (at most once per REGION_REGISTRY_MISS_REFRESH_SECONDS), or when
+    invalidated after the table changed.
+    """
+
+    def __init__(self, ttl_seconds=REGION_REGISTRY_TTL_SECONDS, miss_refresh_seconds=REGION_REGISTRY_MISS_REFRESH_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+        self.refresh_lock = threading.Lock()
+        self.snapshot = RegionSnapshot.build([], None)
+        # (snapshot, index) so an index is never used with another snapshot
+        self.spatial_index = (None, None)
+
+    def is_stale(self, snapshot):
+        return snapshot.loaded_at is None or time.monotonic() - snapshot.loaded_at > self.ttl_seconds
+
+    def refresh(self):
+        from data_api.supabase.database import load_regions
+
+        # Readers keep the previous snapshot until this single assignment
+        self.snapshot = RegionSnapshot.build(load_regions(), time.monotonic())
+
+    def invalidate(self):
+        self.snapshot = self.snapshot._replace(loaded_at=None)
+
+    def get_snapshot(self):
+        snapshot = self.snapshot
+        if not self.is_stale(snapshot):
+            return snapshot
+        with self.refresh_lock:
+            # Another thread may have reloaded while this one waited
+            if self.is_stale(self.snapshot):
+                self.refresh()
+            return self.snapshot
+
+    def refresh_on_miss(self):
+        """
+        Reloads after an unknown name unless the registry was loaded recently,
+        so unknown names from clients don't each cost a full table read.
+        """
+        with self.refresh_lock:
+            loaded_at = self.snapshot.loaded_at
+            if loaded_at is None or time.monotonic() - loaded_at >= self.miss_refresh_seconds:
+                self.refresh()
+            return self.snapshot
+
+    def all(self):
+        return self.get_snapshot().regions
+
+    def get_names(self):
+        return self.get_snapshot().names
+
+    def get_by_name(self, name):
+        return self.get_snapshot().by_name.get(name.lower())
+
+    def get_by_id(self, region_id):
+        return self.get_snapshot().by_id.get(region_id)
+
+    def lookup_names(self, names):
+        """
+        Returns (unknown names, snapshot they were looked up in).
+        """
+        snapshot = self.get_snapshot()
+        unknown = [name for name in names if name.lower() not in snapshot.by_name]
+        if unknown:
+            # The region may have been added since the last load
+            snapshot = self.refresh_on_miss()
+            unknown = [name for name in unknown if name.lower() not in snapshot.by_name]
+        return unknown, snapshot
+
+    def get_unknown_names(self, names):
+        return self.lookup_names(names)[0]
+
+    def resolve_ids(self, names):
+        """
+        Maps region names to ids, unknown names are ignored.
+        """
+        _, snapshot = self.lookup_names(names)
+        return [snapshot.by_name[name.lower()]["id"] for name in names if name.lower() in snapshot.by_name]
+
+    def get_nearest(self, latitude, longitude, k=1):
+        """
+        Returns up to k (region, distance_km) tuples closest to the coordinates.
+        """
+        snapshot = self.get_snapshot()
+        indexed_snapshot, spatial_index = self.spatial_index
+        if indexed_snapshot is not snapshot:
+            from data_api.regions.spatial import RegionSpatialIndex
+
+            spatial_index = RegionSpatialIndex(snapshot.regions)
+            self.spatial_index = (snapshot, spatial_index)
+        return spatial_index.query(latitude, longitude, k)
+
+
+# Shared registry instance
+region_registry = RegionRegistry()
@@ -0,0 +1,35 @@
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class RegionSpatialIndex:
+    """
+    Haversine BallTree over region coordinates, answers k-nearest queries in
+    O(log n) instead of scanning every region.
+    """
+
+    def __init__(self, regions):
+        self.regions = [
+            region for region in regions
+            if region.get("latitude") is not None and region.get("longitude") is not None
+        ]
+        coordinates = np.radians([
+            [float(region["latitude"]), float(region["longitude"])] for region in self.regions
+        ]).reshape(-1, 2)
+        self.tree = BallTree(coordinates, metric="haversine") if self.regions else None
+
+    def query(self, latitude, longitude, k=1):
+        """
+        Returns up to k (region, distance_km) tuples, closest first.
+        """
+        if self.tree is None:
+            return []
+
+        k = min(k, len(self.regions))
+        distances, indices = self.tree.query(np.radians([[latitude, longitude]]), k=k)
+        return [
+            (self.regions[index], float(distance) * EARTH_RADIUS_KM)
+            for distance, index in zip(distances[0], indices[0])
+        ]
@@ -0,0 +1,158 @@
+import io
+import json
+from abc import ABC, abstractmethod
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+ROW_KEYS = ("time", "region_id", "region")
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")).encode() + b"\n"
+
+
+def get_row_metrics(rows):
+    return [key for key in rows[0].keys() if key not in ROW_KEYS] if rows else []
+
+
+def rows_to_columns(rows):
+    """
+    Flattens rows into one list per column, the region being reduced to its name.
+    """
+    metrics = get_row_metrics(rows)
+    columns = {"time": [], "region_id": [], "region": [], **{metric: [] for metric in metrics}}
+    for row in rows:
+        columns["time"].append(row["time"])
+        columns["region_id"].append(row["region_id"])
+        columns["region"].append((row.get("region") or {}).get("name"))
+        for metric in metrics:
+            columns[metric].append(row.get(metric))
+    return columns
+
+
+def rows_to_columnar(rows):
+    """
+    Groups rows by region with a shared time axis and one array per metric:
+    {"metrics": [...], "regions": [{"region_id", "region", "time": [...], "<metric>": [...]}]}
+    """
+    metrics = get_row_metrics(rows)
+    series_by_region = {}
+    for row in sorted(rows, key=lambda x: (x["region_id"], x["time"])):
+        series = series_by_region.get(row["region_id"])
+        if series is None:
+            series = {
+                "region_id": row["region_id"],
+                "region": (row.get("region") or {}).get("name"),
+                "time": [],
+                **{metric: [] for metric in metrics}
+            }
+            series_by_region[row["region_id"]] = series
+        series["time"].append(row["time"])
+        for metric in metrics:
+            series[metric].append(row.get(metric))
+
+    return {"metrics": metrics, "regions": list(series_by_region.values())}
+
+
+def rows_to_arrow_table(rows):
+    import pandas as pd
+    import pyarrow as pa
+
+    df = pd.DataFrame(rows_to_columns(rows))
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def get_rows(data):
+    # Paginated responses wrap their rows in {cursor, next, results}
+    return data["results"] if isinstance(data, dict) else data
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON. Data views stream their rows themselves when this
+    renderer is selected, so it only renders plain responses such as errors.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(ndjson_lines(rows))
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    JSON with one array per metric and a shared time axis per region instead of
+    one object per row, so metric names are not repeated on every hour.
+    """
+    media_type = 'application/vnd.smartcity.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list):
+            data = rows_to_columnar(data)
+        elif isinstance(data, dict) and "results" in data:
+            data = {**data, "results": rows_to_columnar(data["results"])}
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class BinaryTableRenderer(BaseRenderer, ABC):
+    """
+    Renders rows as a pyarrow Table written by the subclass' write_table.
+    """
+    charset = None
+    render_style = 'binary'
+    extension = None
+
+    @abstractmethod
+    def write_table(self, table, sink):
+        """
+        Writes the pyarrow Table to the binary sink.
+        """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.status_code >= 400:
+            # Errors stay readable instead of becoming an empty table
+            response['Content-Type'] = JSONRenderer.media_type
+            return JSONRenderer().render(data)
+
+        if response is not None:
+            response['Content-Disposition'] = f'attachment; filename="data.{self.extension}"'
+            if isinstance(data, dict) and data.get("cursor"):
+                response['X-Next-Cursor'] = data["cursor"]
+
+        sink = io.BytesIO()
+        self.write_table(rows_to_arrow_table(get_rows(data)), sink)
+        return sink.getvalue()
+
+
+class ArrowRenderer(BinaryTableRenderer):
+    """
+    Apache Arrow IPC stream, readable with pyarrow.ipc.open_stream or apache-arrow in JS.
+    """
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    extension = 'arrows'
+
+    def write_table(self, table, sink):
+        import pyarrow as pa
+
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class ParquetRenderer(BinaryTableRenderer):
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+    extension = 'parquet'
+
+    def write_table(self, table, sink):
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink, compression='zstd')
@@ -2,8 +2,14 @@ from datetime import datetime, date
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from data_api.data.data import get_data_common, get_predictions
+from data_api.data.data import get_data_common, get_predictions, get_nearest_regions
+from data_api.http_cache import conditional_get
+from data_api.http_client import latency_histograms
+from data_api.pagination import build_next_query
+from data_api.renderers import NDJSONRenderer, ColumnarJSONRenderer, ArrowRenderer, ParquetRenderer
 from data_api.ingestion.update_ingestion import update_ingestion
 
 from drf_spectacular.utils import (
@@ -37,6 +43,38 @@ class NormalizedDataSerializer(serializers.Serializer):
 class ErrorResponseSerializer(serializers.Serializer):
     error = serializers.CharField()
 
+class NormalizedDataPageSerializer(serializers.Serializer):
+    cursor = serializers.CharField(allow_null=True, help_text="Opaque cursor of the next page, null on the last page")
+    next = serializers.URLField(allow_null=True, help_text="URL of the next page, null on the last page")
+    results = NormalizedDataSerializer(many=True)
+
+
+def get_request_param(request, name, many=False):
+    """
+    Reads a parameter from the query string first, then from the request body.
+    """
+    if name in request.query_params:
+        return request.query_params.getlist(name) if many else request.query_params.get(name)
+    return request.data.get(name)
+
+
+def add_next_link(request, response):
+    """
+    Turns the cursor of a paginated response into an absolute `next` link.
+    """
+    if not isinstance(response, Response) or not isinstance(response.data, dict):
+        return response
+
+    cursor = response.data.get('cursor')
+    if cursor:
+        query = build_next_query(
+            lambda name, many: get_request_param(request, name, many),
+            cursor,
+            [(name, value) for name, values in request.query_params.lists() for value in values]
+        )
+        response.data['next'] = request.build_absolute_uri(f"{request.path}?{query}")
+    return response
+
 
 @extend_schema_view(
     get=extend_schema(
@@ -57,6 +95,31 @@ class ErrorResponseSerializer(serializers.Serializer):
         
         **Date Format:** 
         Dates must be in YYYY-MM-DD format. Start date cannot be later than end date.
+
+        **Streaming:**
+        With `?format=ndjson` (or `Accept: application/x-ndjson`) rows are streamed as
+        newline-delimited JSON, read from the database page by page.
+
+        **Columnar formats:**
+        - `?format=columnar`: one array per metric plus a shared `time` axis per region
+        - `?format=arrow`: Apache Arrow IPC stream download
+        - `?format=parquet`: Parquet file download
+
+        **Downsampling:**
+        `resolution=day|week` aggregates rows per region and time bucket in the database,
+        with `aggregate=mean|min|max|sum` (default mean). `hour` returns the stored rows,
+        `day` reads the daily rollup refreshed by each ingestion.
+        Pagination is only available for hourly data.
+
+        **Conditional requests:**
+        Responses carry an `ETag` and `Last-Modified` derived from the latest ingestion
+        and the query, and a `Cache-Control` max-age lasting until the next ingestion.
+        Send them back in `If-None-Match` / `If-Modified-Since` to get a 304.
+
+        **Pagination:**
+        When `limit` or `cursor` is given, rows are returned ordered by (time, region_id)
+        in pages of at most `limit` rows, wrapped in `{cursor, next, results}`. Follow
+        `next` (or pass `cursor` back) until it is null.
         ''',
         parameters=[
             OpenApiParameter(
@@ -120,6 +183,32 @@ class ErrorResponseSerializer(serializers.Serializer):
                         value=['temperature']
                     )
                 ]
+            ),
+            OpenApiParameter(
+                name='resolution',
+                description='Time bucket of the returned rows: hour (default), day or week.',
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=['hour', 'day', 'week']
+            ),
+            OpenApiParameter(
+                name='aggregate',
+                description='Aggregate applied per bucket when resolution is day or week. Defaults to mean.',
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=['mean', 'min', 'max', 'sum']
+            ),
+            OpenApiParameter(
+                name='limit',
+                description='Page size (1-1000). Enables keyset pagination, defaults to 500 when only a cursor is given.',
+                required=False,
+                type=OpenApiTypes.INT
+            ),
+            OpenApiParameter(
+                name='cursor',
+                description='Opaque cursor returned by the previous page.',
+                required=False,
+                type=OpenApiTypes.STR
             )
         ],
         responses={
@@ -201,23 +290,81 @@ class DataView(APIView):
     API view to retrieve normalized data based on regions, date range, and metrics.
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        NDJSONRenderer, ColumnarJSONRenderer, ArrowRenderer, ParquetRenderer
+    ]
 
     def get(self, request):
-        return get_data_common(
-            regions=request.data.get('regions'),
-            start=request.data.get('start'),
-            end=request.data.get('end'),
-            metrics=request.data.get('metrics')
-        )
+        return conditional_get(request, lambda: add_next_link(request, get_data_common(
+            regions=get_request_param(request, 'regions', many=True),
+            start=get_request_param(request, 'start'),
+            end=get_request_param(request, 'end'),
+            metrics=get_request_param(request, 'metrics', many=True),
+            limit=get_request_param(request, 'limit'),
+            cursor=get_request_param(request, 'cursor'),
+            stream=request.accepted_renderer.format == NDJSONRenderer.format,
+            resolution=get_request_param(request, 'resolution'),
+            aggregate=get_request_param(request, 'aggregate')
+        )))
 
 class PredictionView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+    def get(self, request):
+        return conditional_get(request, lambda: get_predictions(
+            regions=get_request_param(request, 'regions', many=True),
+            start=get_request_param(request, 'start'),
+            metrics=get_request_param(request, 'metrics', many=True),
+            stream=request.accepted_renderer.format == NDJSONRenderer.format
+        ))
+
+@extend_schema(
+    tags=['Data'],
+    summary='Get provider latency histograms',
+    description='Latency histograms of the weather provider requests made by this process, per provider.',
+    responses={200: OpenApiTypes.OBJECT}
+)
+class ProviderLatencyView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(latency_histograms.snapshot())
+
+@extend_schema(
+    tags=['Regions'],
+    summary='Get the nearest regions',
+    description='Regions closest to a coordinate, by great-circle distance, closest first.',
+    parameters=[
+        OpenApiParameter(name='lat', type=OpenApiTypes.FLOAT, location=OpenApiParameter.QUERY, required=True,
+                         description='Latitude in degrees'),
+        OpenApiParameter(name='lon', type=OpenApiTypes.FLOAT, location=OpenApiParameter.QUERY, required=True,
+                         description='Longitude in degrees'),
+        OpenApiParameter(name='k', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, required=False,
+                         description='Number of regions to return (default 1, max 50)')
+    ],
+    responses={
+        200: OpenApiResponse(
+            description='Nearest regions',
+            examples=[
+                OpenApiExample(
+                    'Nearest Region',
+                    value=[{'id': 4, 'name': 'paris', 'latitude': 48.8566, 'longitude': 2.3522, 'distance_km': 3.412}]
+                )
+            ]
+        ),
+        400: OpenApiResponse(response=ErrorResponseSerializer, description='Invalid parameters')
+    }
+)
+class NearestRegionView(APIView):
+    permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        return get_predictions(
-            regions=request.data.get('regions'),
-            start=request.data.get('start'),
-            metrics=request.data.get('metrics')
+        return get_nearest_regions(
+            lat=request.query_params.get('lat'),
+            lon=request.query_params.get('lon'),
+            k=request.query_params.get('k')
         )
 
 def ingestion_job():
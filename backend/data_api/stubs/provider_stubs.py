@@ -0,0 +1,107 @@
+"""
+Local stand-ins for the Open-Meteo and Visual Crossing APIs, serving
+deterministic fixture responses so ingestion can be run and benchmarked
+offline. Point OPENMETEO_BASE_URL / VISUALCROSSING_BASE_URL at the server
+before importing the provider modules.
+"""
+import json
+import math
+import threading
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+OPENMETEO_METRICS = [
+    "temperature_2m", "apparent_temperature", "relative_humidity_2m", "dewpoint_2m",
+    "precipitation_probability", "precipitation", "snowfall", "snow_depth", "wind_gusts_10m",
+    "wind_speed_10m", "wind_direction_10m", "surface_pressure", "visibility", "cloud_cover"
+]
+
+
+def fixture_value(metric, latitude, longitude, hour_index):
+    # Smooth daily cycle, distinct per metric and location
+    seed = sum(map(ord, metric)) + latitude * 7 + longitude * 3
+    return round(50 + 20 * math.sin((hour_index + seed) * 2 * math.pi / 24), 1)
+
+
+def get_hours(start_date, end_date):
+    start = datetime.combine(date.fromisoformat(start_date), datetime.min.time())
+    hours = (date.fromisoformat(end_date) - date.fromisoformat(start_date)).days * 24 + 24
+    return [start + timedelta(hours=index) for index in range(hours)]
+
+
+def build_openmeteo_location(latitude, longitude, start_date, end_date, metrics):
+    hours = get_hours(start_date, end_date)
+    hourly = {"time": [hour.strftime("%Y-%m-%dT%H:%M") for hour in hours]}
+    for metric in metrics:
+        hourly[metric] = [fixture_value(metric, latitude, longitude, index) for index in range(len(hours))]
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "hourly_units": {"time": "iso8601", "temperature_2m": "°C"},
+        "hourly": hourly
+    }
+
+
+def build_openmeteo_response(query):
+    latitudes = [float(value) for value in query["latitude"][0].split(",")]
+    longitudes = [float(value) for value in query["longitude"][0].split(",")]
+    metrics = query["hourly"][0].split(",")
+    locations = [
+        build_openmeteo_location(latitude, longitude, query["start_date"][0], query["end_date"][0], metrics)
+        for latitude, longitude in zip(latitudes, longitudes)
+    ]
+    return locations if len(locations) > 1 else locations[0]
+
+
+def build_visualcrossing_response(location, start_date, end_date, elements):
+    latitude, longitude = (float(value) for value in location.split(","))
+    days = {}
+    for index, hour in enumerate(get_hours(start_date, end_date)):
+        values = {
+            element: fixture_value(element, latitude, longitude, index) + 0.5
+            for element in elements if element != "datetimeEpoch"
+        }
+        values["datetimeEpoch"] = int(hour.replace(tzinfo=timezone.utc).timestamp())
+        values["datetime"] = hour.strftime("%H:%M:%S")
+        days.setdefault(hour.date().isoformat(), []).append(values)
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "days": [{"datetime": day, "hours": hours} for day, hours in days.items()]
+    }
+
+
+class ProviderStubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/v1/forecast":
+            payload = build_openmeteo_response(query)
+        elif url.path.startswith("/VisualCrossingWebServices/rest/services/timeline/"):
+            location, start_date, end_date = unquote(url.path).split("/")[-3:]
+            payload = build_visualcrossing_response(location, start_date, end_date, query["elements"][0].split(","))
+        else:
+            self.send_error(404)
+            return
+
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host="127.0.0.1", port=0):
+    """
+    Starts the stub server in a daemon thread, returns (server, base_url).
+    """
+    server = ThreadingHTTPServer((host, port), ProviderStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
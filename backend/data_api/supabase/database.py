@@ -1,31 +1,157 @@
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 from dotenv import load_dotenv
 import os
+import time
+
+from data_api.ingestion.concurrency import map_concurrently
+from data_api.mapping.common import format_utc_timestamp
+from data_api.regions.registry import region_registry
 
 load_dotenv()
 url: str = os.getenv("SUPABASE_URL")
 key: str = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(url, key)
 
+UPSERT_CHUNK_SIZE = int(os.getenv("UPSERT_CHUNK_SIZE", 1000))
+UPSERT_MAX_WORKERS = int(os.getenv("UPSERT_MAX_WORKERS", 4))
+UPSERT_MAX_RETRIES = 2
+UPSERT_BACKOFF_SECONDS = 1
+PAGE_SIZE = 1000  # PostgREST row cap of a single response
+
+
+def fetch_all_pages(build_query, page_size=PAGE_SIZE):
+    """
+    Reads every row of a query past the PostgREST row cap. build_query(offset, limit)
+    returns a fresh query (table or rpc) reading that slice; pages are read
+    until one comes back short.
+    """
+    data = []
+    while True:
+        rows = build_query(len(data), page_size).execute().data
+        data += rows
+        if len(rows) < page_size:
+            return data
+
+
+def format_bucket_times(rows):
+    """
+    Formats the `time` of aggregated rows like hourly normalized_data rows
+    (see format_utc_timestamp): rollup days come back as dates and RPC week
+    buckets as timestamptz.
+    """
+    for row in rows:
+        row["time"] = format_utc_timestamp(row["time"])
+    return rows
+
+
 # Region functions
 def save_cities(data):
     response = supabase.table("region") \
         .upsert(data, on_conflict="name") \
         .execute()
+    region_registry.invalidate()
     print(response)
 
 def load_regions():
-    response = supabase.table("region").select("*").execute()
-    return response.data
+    return fetch_all_pages(lambda offset, limit: (
+        supabase
+        .table("region")
+        .select("*")
+        .order("id")
+        .range(offset, offset + limit - 1)
+    ))
+
+def resolve_region_ids(regions):
+    """
+    Maps region names to their ids so queries can filter on the indexed region_id
+    column instead of the embedded region name. Unknown names are ignored.
+    """
+    return region_registry.resolve_ids(regions)
 
 # Normalized data functions
+def upsert_chunk(table, rows, on_conflict):
+    """
+    Upserts one chunk, retrying transient failures. A chunk rejected by the
+    database is split in halves so a single bad row only loses itself.
+    Returns (rows written, rows failed, latency of each request).
+    """
+    latencies = []
+    for attempt in range(UPSERT_MAX_RETRIES + 1):
+        started_at = time.perf_counter()
+        try:
+            supabase.table(table).upsert(rows, on_conflict=on_conflict).execute()
+            latencies.append(time.perf_counter() - started_at)
+            return len(rows), 0, latencies
+        except APIError as e:
+            latencies.append(time.perf_counter() - started_at)
+            if len(rows) == 1:
+                print(f"Upsert into {table} rejected row {rows[0].get('time')} / {rows[0].get('region_id')}: {e}")
+                return 0, 1, latencies
+            middle = len(rows) // 2
+            written_left, failed_left, latencies_left = upsert_chunk(table, rows[:middle], on_conflict)
+            written_right, failed_right, latencies_right = upsert_chunk(table, rows[middle:], on_conflict)
+            return (
+                written_left + written_right,
+                failed_left + failed_right,
+                latencies + latencies_left + latencies_right
+            )
+        except Exception as e:
+            latencies.append(time.perf_counter() - started_at)
+            if attempt == UPSERT_MAX_RETRIES:
+                print(f"Upsert into {table} failed for {len(rows)} rows: {e}")
+                return 0, len(rows), latencies
+            time.sleep(UPSERT_BACKOFF_SECONDS * 2 ** attempt)
+
+def bulk_upsert(table, rows, on_conflict, chunk_size=UPSERT_CHUNK_SIZE, max_workers=UPSERT_MAX_WORKERS):
+    """
+    Upserts rows in bounded chunks sent concurrently, each chunk retried on its own.
+    Returns a report of rows written / failed and per-request latencies.
+    """
+    chunks = [rows[index:index + chunk_size] for index in range(0, len(rows), chunk_size)]
+    results = map_concurrently(lambda chunk: upsert_chunk(table, chunk, on_conflict), chunks, max_workers)
+
+    report = {"rows": len(rows), "rows_written": 0, "rows_failed": 0, "chunks": len(chunks), "latencies": []}
+    for chunk, result, error in results:
+        if error is not None:
+            print(f"Upsert into {table} failed for {len(chunk)} rows: {error}")
+            report["rows_failed"] += len(chunk)
+            continue
+        rows_written, rows_failed, latencies = result
+        report["rows_written"] += rows_written
+        report["rows_failed"] += rows_failed
+        report["latencies"] += latencies
+
+    if report["latencies"]:
+        latencies = sorted(report["latencies"])
+        print(
+            f"Upserted {report['rows_written']}/{report['rows']} rows into {table} "
+            f"in {report['chunks']} chunks ({report['rows_failed']} failed), "
+            f"chunk latency p50 {latencies[len(latencies) // 2]:.3f}s max {latencies[-1]:.3f}s"
+        )
+    return report
+
 def save_normalized_data(data):
-    supabase.table("normalized_data") \
-        .upsert(data, on_conflict="time, region_id") \
-        .execute()
+    return bulk_upsert("normalized_data", data, on_conflict="time, region_id")
+
+def load_row_digests(region_ids, start_time):
+    """
+    Returns the stored digest of every normalized_data row from start_time,
+    as a list of {time, region_id, digest}.
+    """
+    return fetch_all_pages(lambda offset, limit: (
+        supabase
+        .table("normalized_data")
+        .select("time,region_id,digest")
+        .gte("time", start_time)
+        .in_("region_id", region_ids)
+        .order("time")
+        .order("region_id")
+        .range(offset, offset + limit - 1)
+    ))
 
 def load_normalized_data(start_time, end_time, regions, metrics):
-    regions_lowered = list(map(lambda region: region.lower(), regions))
+    region_ids = resolve_region_ids(regions)
 
     response = (
         supabase
@@ -33,23 +159,131 @@ def load_normalized_data(start_time, end_time, regions, metrics):
         .select(",".join(["time", "region_id", "region(name)"] + metrics))
         .gte("time", start_time)
         .lte("time", end_time)
-        .in_("region.name", regions_lowered)
+        .in_("region_id", region_ids)
+        .execute()
+    )
+    return response.data
+
+def execute_keyset_page(query, limit, cursor=None):
+    """
+    Runs a query as one keyset page ordered by (time, region_id).
+    Returns the page rows and the (time, region_id) key of the last row read,
+    or None as key when there is nothing left to read.
+    """
+    if cursor:
+        cursor_time, cursor_region_id = cursor
+        query = query.or_(
+            f'time.gt."{cursor_time}",'
+            f'and(time.eq."{cursor_time}",region_id.gt.{cursor_region_id})'
+        )
+
+    response = (
+        query
+        .order("time")
+        .order("region_id")
+        .limit(limit)
         .execute()
     )
-    return list(filter(lambda x: x["region"] is not None, response.data))
+
+    last_key = None
+    if len(response.data) == limit:
+        last_row = response.data[-1]
+        last_key = (last_row["time"], last_row["region_id"])
+
+    return response.data, last_key
+
+def load_normalized_data_page(start_time, end_time, regions, metrics, limit, cursor=None):
+    region_ids = resolve_region_ids(regions)
+
+    query = (
+        supabase
+        .table("normalized_data")
+        .select(",".join(["time", "region_id", "region(name)"] + metrics))
+        .gte("time", start_time)
+        .lte("time", end_time)
+        .in_("region_id", region_ids)
+    )
+    return execute_keyset_page(query, limit, cursor)
+
+def load_normalized_data_buckets(start_time, end_time, regions, metrics, resolution, aggregate):
+    """
+    Aggregates normalized data per (time bucket, region) in the database
+    (see sql/get_normalized_data_buckets.sql), reading the result in pages
+    so it is not truncated by the PostgREST row cap.
+    """
+    region_ids = resolve_region_ids(regions)
+
+    data = fetch_all_pages(lambda offset, limit: supabase.rpc("get_normalized_data_buckets", {
+        "start_time": str(start_time),
+        "end_time": str(end_time),
+        "region_ids": region_ids,
+        "metrics": metrics,
+        "resolution": resolution,
+        "aggregate": aggregate,
+        "row_limit": limit,
+        "row_offset": offset
+    }))
+    return format_bucket_times(data)
+
+def refresh_normalized_data_daily(rows):
+    """
+    Recomputes the daily rollup (see sql/normalized_data_daily.sql) for the
+    (day, region) pairs touched by the given normalized_data rows only.
+    """
+    touched = sorted({(str(row["time"])[:10], row["region_id"]) for row in rows})
+    if not touched:
+        return
+
+    supabase.rpc("refresh_normalized_data_daily", {
+        "days": [day for day, _ in touched],
+        "region_ids": [region_id for _, region_id in touched]
+    }).execute()
+
+def load_normalized_data_daily(start_time, end_time, regions, metrics, aggregate):
+    """
+    Reads the daily rollup shaped like normalized_data rows, each metric being
+    its <metric>_<aggregate> rollup column.
+    """
+    region_ids = resolve_region_ids(regions)
+    columns = ["time:day", "region_id", "region(name)"] + [f"{metric}:{metric}_{aggregate}" for metric in metrics]
+
+    data = fetch_all_pages(lambda offset, limit: (
+        supabase
+        .table("normalized_data_daily")
+        .select(",".join(columns))
+        .gte("day", start_time)
+        .lte("day", end_time)
+        .in_("region_id", region_ids)
+        .order("day")
+        .order("region_id")
+        .range(offset, offset + limit - 1)
+    ))
+    return format_bucket_times(data)
 
 def load_predictions(start_time, regions, metrics):
-    regions_lowered = list(map(lambda region: region.lower(), regions))
+    region_ids = resolve_region_ids(regions)
 
     response = (
         supabase
         .table("predictions")
         .select(",".join(["time", "region_id", "region(name)"] + metrics))
         .gte("time", start_time)
-        .in_("region.name", regions_lowered)
+        .in_("region_id", region_ids)
         .execute()
     )
-    return list(filter(lambda x: x["region"] is not None, response.data))
+    return response.data
+
+def load_predictions_page(start_time, regions, metrics, limit, cursor=None):
+    region_ids = resolve_region_ids(regions)
+
+    query = (
+        supabase
+        .table("predictions")
+        .select(",".join(["time", "region_id", "region(name)"] + metrics))
+        .gte("time", start_time)
+        .in_("region_id", region_ids)
+    )
+    return execute_keyset_page(query, limit, cursor)
 
 def get_latest_timestamp_by_cities():
     response = supabase.rpc("get_latest_time_by_region_id").execute()
@@ -0,0 +1,57 @@
+-- Time-bucket aggregation of normalized_data, called through
+-- supabase.rpc("get_normalized_data_buckets", ...) by load_normalized_data_buckets.
+-- Returns one jsonb row per (bucket, region) shaped like a normalized_data row:
+-- {"time", "region_id", "region": {"name"}, "<metric>": <aggregate>, ...}
+create or replace function get_normalized_data_buckets(
+    start_time timestamptz,
+    end_time timestamptz,
+    region_ids bigint[],
+    metrics text[],
+    resolution text default 'day',
+    aggregate text default 'avg',
+    row_limit integer default 1000,
+    row_offset integer default 0
+)
+returns setof jsonb
+language plpgsql
+stable
+as $$
+declare
+    metric_columns text;
+begin
+    if resolution not in ('hour', 'day', 'week') then
+        raise exception 'Unknown resolution: %', resolution;
+    end if;
+    if aggregate not in ('avg', 'min', 'max', 'sum') then
+        raise exception 'Unknown aggregate: %', aggregate;
+    end if;
+
+    -- Only real normalized_data columns can end up in the dynamic query
+    select string_agg(format('%s(d.%I) as %I', aggregate, c.column_name, c.column_name), ', ')
+    into metric_columns
+    from information_schema.columns c
+    where c.table_schema = 'public'
+      and c.table_name = 'normalized_data'
+      and c.column_name = any(metrics);
+
+    if metric_columns is null then
+        raise exception 'No known metric in %', metrics;
+    end if;
+
+    return query execute format(
+        'select to_jsonb(bucket) from (
+            select date_trunc(%L, d.time) as time,
+                   d.region_id,
+                   jsonb_build_object(''name'', r.name) as region,
+                   %s
+            from normalized_data d
+            join region r on r.id = d.region_id
+            where d.time >= $1 and d.time <= $2 and d.region_id = any($3)
+            group by 1, 2, r.name
+            order by 1, 2
+            limit $4 offset $5
+        ) bucket',
+        resolution, metric_columns
+    ) using start_time, end_time, region_ids, row_limit, row_offset;
+end;
+$$;
@@ -0,0 +1,260 @@
+-- Daily rollup of normalized_data: one row per (day, region) holding the
+-- avg/min/max/sum of every metric of get_all_metrics(), as <metric>_<aggregate>.
+-- update_ingestion refreshes only the (day, region) pairs it wrote through
+-- supabase.rpc("refresh_normalized_data_daily", ...).
+--
+-- Initial population, once the objects below exist:
+--   select refresh_normalized_data_daily(array_agg(day), array_agg(region_id))
+--   from (select distinct time::date as day, region_id from normalized_data) d;
+create table if not exists normalized_data_daily (
+    day date not null,
+    region_id bigint not null references region(id),
+    temperature_avg double precision,
+    temperature_min double precision,
+    temperature_max double precision,
+    temperature_sum double precision,
+    apparent_temperature_avg double precision,
+    apparent_temperature_min double precision,
+    apparent_temperature_max double precision,
+    apparent_temperature_sum double precision,
+    humidity_avg double precision,
+    humidity_min double precision,
+    humidity_max double precision,
+    humidity_sum double precision,
+    dew_point_avg double precision,
+    dew_point_min double precision,
+    dew_point_max double precision,
+    dew_point_sum double precision,
+    precipitation_probability_avg double precision,
+    precipitation_probability_min double precision,
+    precipitation_probability_max double precision,
+    precipitation_probability_sum double precision,
+    precipitation_avg double precision,
+    precipitation_min double precision,
+    precipitation_max double precision,
+    precipitation_sum double precision,
+    snow_avg double precision,
+    snow_min double precision,
+    snow_max double precision,
+    snow_sum double precision,
+    snow_depth_avg double precision,
+    snow_depth_min double precision,
+    snow_depth_max double precision,
+    snow_depth_sum double precision,
+    wind_gust_avg double precision,
+    wind_gust_min double precision,
+    wind_gust_max double precision,
+    wind_gust_sum double precision,
+    wind_speed_avg double precision,
+    wind_speed_min double precision,
+    wind_speed_max double precision,
+    wind_speed_sum double precision,
+    wind_direction_avg double precision,
+    wind_direction_min double precision,
+    wind_direction_max double precision,
+    wind_direction_sum double precision,
+    pressure_avg double precision,
+    pressure_min double precision,
+    pressure_max double precision,
+    pressure_sum double precision,
+    visibility_avg double precision,
+    visibility_min double precision,
+    visibility_max double precision,
+    visibility_sum double precision,
+    cloud_cover_avg double precision,
+    cloud_cover_min double precision,
+    cloud_cover_max double precision,
+    cloud_cover_sum double precision,
+    primary key (day, region_id)
+);
+
+create or replace function refresh_normalized_data_daily(
+    days date[],
+    region_ids bigint[]
+)
+returns void
+language sql
+as $$
+    insert into normalized_data_daily (
+        day,
+        region_id,
+        temperature_avg,
+        temperature_min,
+        temperature_max,
+        temperature_sum,
+        apparent_temperature_avg,
+        apparent_temperature_min,
+        apparent_temperature_max,
+        apparent_temperature_sum,
+        humidity_avg,
+        humidity_min,
+        humidity_max,
+        humidity_sum,
+        dew_point_avg,
+        dew_point_min,
+        dew_point_max,
+        dew_point_sum,
+        precipitation_probability_avg,
+        precipitation_probability_min,
+        precipitation_probability_max,
+        precipitation_probability_sum,
+        precipitation_avg,
+        precipitation_min,
+        precipitation_max,
+        precipitation_sum,
+        snow_avg,
+        snow_min,
+        snow_max,
+        snow_sum,
+        snow_depth_avg,
+        snow_depth_min,
+        snow_depth_max,
+        snow_depth_sum,
+        wind_gust_avg,
+        wind_gust_min,
+        wind_gust_max,
+        wind_gust_sum,
+        wind_speed_avg,
+        wind_speed_min,
+        wind_speed_max,
+        wind_speed_sum,
+        wind_direction_avg,
+        wind_direction_min,
+        wind_direction_max,
+        wind_direction_sum,
+        pressure_avg,
+        pressure_min,
+        pressure_max,
+        pressure_sum,
+        visibility_avg,
+        visibility_min,
+        visibility_max,
+        visibility_sum,
+        cloud_cover_avg,
+        cloud_cover_min,
+        cloud_cover_max,
+        cloud_cover_sum
+    )
+    select
+        d.time::date,
+        d.region_id,
+        avg(d.temperature),
+        min(d.temperature),
+        max(d.temperature),
+        sum(d.temperature),
+        avg(d.apparent_temperature),
+        min(d.apparent_temperature),
+        max(d.apparent_temperature),
+        sum(d.apparent_temperature),
+        avg(d.humidity),
+        min(d.humidity),
+        max(d.humidity),
+        sum(d.humidity),
+        avg(d.dew_point),
+        min(d.dew_point),
+        max(d.dew_point),
+        sum(d.dew_point),
+        avg(d.precipitation_probability),
+        min(d.precipitation_probability),
+        max(d.precipitation_probability),
+        sum(d.precipitation_probability),
+        avg(d.precipitation),
+        min(d.precipitation),
+        max(d.precipitation),
+        sum(d.precipitation),
+        avg(d.snow),
+        min(d.snow),
+        max(d.snow),
+        sum(d.snow),
+        avg(d.snow_depth),
+        min(d.snow_depth),
+        max(d.snow_depth),
+        sum(d.snow_depth),
+        avg(d.wind_gust),
+        min(d.wind_gust),
+        max(d.wind_gust),
+        sum(d.wind_gust),
+        avg(d.wind_speed),
+        min(d.wind_speed),
+        max(d.wind_speed),
+        sum(d.wind_speed),
+        avg(d.wind_direction),
+        min(d.wind_direction),
+        max(d.wind_direction),
+        sum(d.wind_direction),
+        avg(d.pressure),
+        min(d.pressure),
+        max(d.pressure),
+        sum(d.pressure),
+        avg(d.visibility),
+        min(d.visibility),
+        max(d.visibility),
+        sum(d.visibility),
+        avg(d.cloud_cover),
+        min(d.cloud_cover),
+        max(d.cloud_cover),
+        sum(d.cloud_cover)
+    from normalized_data d
+    join unnest(days, region_ids) as touched(day, region_id)
+        on d.region_id = touched.region_id
+       and d.time >= touched.day
+       and d.time < touched.day + 1
+    group by 1, 2
+    on conflict (day, region_id) do update set
+        temperature_avg = excluded.temperature_avg,
+        temperature_min = excluded.temperature_min,
+        temperature_max = excluded.temperature_max,
+        temperature_sum = excluded.temperature_sum,
+        apparent_temperature_avg = excluded.apparent_temperature_avg,
+        apparent_temperature_min = excluded.apparent_temperature_min,
+        apparent_temperature_max = excluded.apparent_temperature_max,
+        apparent_temperature_sum = excluded.apparent_temperature_sum,
+        humidity_avg = excluded.humidity_avg,
+        humidity_min = excluded.humidity_min,
+        humidity_max = excluded.humidity_max,
+        humidity_sum = excluded.humidity_sum,
+        dew_point_avg = excluded.dew_point_avg,
+        dew_point_min = excluded.dew_point_min,
+        dew_point_max = excluded.dew_point_max,
+        dew_point_sum = excluded.dew_point_sum,
+        precipitation_probability_avg = excluded.precipitation_probability_avg,
+        precipitation_probability_min = excluded.precipitation_probability_min,
+        precipitation_probability_max = excluded.precipitation_probability_max,
+        precipitation_probability_sum = excluded.precipitation_probability_sum,
+        precipitation_avg = excluded.precipitation_avg,
+        precipitation_min = excluded.precipitation_min,
+        precipitation_max = excluded.precipitation_max,
+        precipitation_sum = excluded.precipitation_sum,
+        snow_avg = excluded.snow_avg,
+        snow_min = excluded.snow_min,
+        snow_max = excluded.snow_max,
+        snow_sum = excluded.snow_sum,
+        snow_depth_avg = excluded.snow_depth_avg,
+        snow_depth_min = excluded.snow_depth_min,
+        snow_depth_max = excluded.snow_depth_max,
+        snow_depth_sum = excluded.snow_depth_sum,
+        wind_gust_avg = excluded.wind_gust_avg,
+        wind_gust_min = excluded.wind_gust_min,
+        wind_gust_max = excluded.wind_gust_max,
+        wind_gust_sum = excluded.wind_gust_sum,
+        wind_speed_avg = excluded.wind_speed_avg,
+        wind_speed_min = excluded.wind_speed_min,
+        wind_speed_max = excluded.wind_speed_max,
+        wind_speed_sum = excluded.wind_speed_sum,
+        wind_direction_avg = excluded.wind_direction_avg,
+        wind_direction_min = excluded.wind_direction_min,
+        wind_direction_max = excluded.wind_direction_max,
+        wind_direction_sum = excluded.wind_direction_sum,
+        pressure_avg = excluded.pressure_avg,
+        pressure_min = excluded.pressure_min,
+        pressure_max = excluded.pressure_max,
+        pressure_sum = excluded.pressure_sum,
+        visibility_avg = excluded.visibility_avg,
+        visibility_min = excluded.visibility_min,
+        visibility_max = excluded.visibility_max,
+        visibility_sum = excluded.visibility_sum,
+        cloud_cover_avg = excluded.cloud_cover_avg,
+        cloud_cover_min = excluded.cloud_cover_min,
+        cloud_cover_max = excluded.cloud_cover_max,
+        cloud_cover_sum = excluded.cloud_cover_sum;
+$$;
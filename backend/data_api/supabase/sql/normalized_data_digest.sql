@@ -0,0 +1,4 @@
+-- Digest of the metric vector of each normalized_data row, written by
+-- update_ingestion so unchanged forecast hours are not upserted again
+-- (see data_api/ingestion/change_detection.py).
+alter table normalized_data add column if not exists digest text;
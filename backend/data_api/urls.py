@@ -1,11 +1,13 @@
 from django.urls import path, include
 
-from data_api.routes import DataView, PredictionView
+from data_api.routes import DataView, PredictionView, ProviderLatencyView, NearestRegionView
 
 app_name = 'data_api'
 
 urlpatterns = [
     path('api/data/', DataView.as_view(), name='get_data'),
     path('api/prediction/', PredictionView.as_view(), name='get_predictions'),
+    path('api/regions/nearest/', NearestRegionView.as_view(), name='nearest_regions'),
+    path('api/providers/latency/', ProviderLatencyView.as_view(), name='provider_latency'),
     path('api/', include('data_api.weather_index.urls')),
 ]
\ No newline at end of file
@@ -1,16 +1,26 @@
-import requests
+import os
 
-api_key = "85b2d49aeced8fb9fe7d3e6a8aa8c2c6"
-
-def get_visualcrossing_data(region_name, metrics, start_time, end_time):
-    # longitude, latitude = get_coorindates(region_name)
-    url = f"https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/{region_name}/{start_time}/{end_time}?include=hours&key={api_key}&elements={metrics}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        return data
-    else:
-        raise Exception(f"Error: {response.status_code}, {response.text}")
+from data_api.cache.response_cache import get_provider_json
+from data_api.mapping.visualcrossing_mapping import convert_common_metrics_to_api_string, convert_to_df
 
+# No default, the key only ever comes from the environment
+api_key = os.getenv("VISUALCROSSING_API_KEY")
+# Overridable to point ingestion at a local stub server
+VISUALCROSSING_BASE_URL = os.getenv("VISUALCROSSING_BASE_URL", "https://weather.visualcrossing.com")
 
+def is_visualcrossing_configured():
+    return bool(api_key)
 
+def get_visualcrossing_data(region, metrics, start_time, end_time):
+    if not api_key:
+        raise Exception("VISUALCROSSING_API_KEY is not set")
+    location = f"{region['latitude']},{region['longitude']}"
+    url = f"{VISUALCROSSING_BASE_URL}/VisualCrossingWebServices/rest/services/timeline/{location}/{start_time}/{end_time}"
+    params = {
+        "include": "hours",
+        "unitGroup": "metric",
+        "key": api_key,
+        "elements": convert_common_metrics_to_api_string(metrics)
+    }
+    data = get_provider_json(url, params, end_time, provider="visualcrossing")
+    return convert_to_df(data, region)
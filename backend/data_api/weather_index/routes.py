@@ -8,6 +8,7 @@ from typing import List, Dict, Any
 import json
 from datetime import datetime, timedelta
 
+from data_api.http_cache import conditional_get
 from .weather_index_calculator import weather_index_calculator
 
 
@@ -101,15 +102,12 @@ class WeatherIndexCurrentView(APIView):
     def get(self, request):
         """Retourne l'indice météo global actuel"""
         try:
-            result = weather_index_calculator.calculate_index()
-            
-            if "error" in result:
-                return Response(
-                    {"error": result["error"]},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
-            return Response(result, status=status.HTTP_200_OK)
+            # La configuration fait partie de l'ETag car elle change le résultat
+            return conditional_get(
+                request,
+                self._calculate_current_index,
+                extra=weather_index_calculator.get_config()
+            )
             
         except Exception as e:
             return Response(
@@ -117,6 +115,18 @@ class WeatherIndexCurrentView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _calculate_current_index(self):
+        """Calcule l'indice actuel, appelé seulement si le client n'a pas déjà la dernière version"""
+        result = weather_index_calculator.calculate_index()
+        
+        if "error" in result:
+            return Response(
+                {"error": result["error"]},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        return Response(result, status=status.HTTP_200_OK)
+
 
 @extend_schema(
     tags=['Weather Index'],
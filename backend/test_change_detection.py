@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from data_api.ingestion.change_detection import DIGEST_COLUMN, compute_row_digests, drop_unchanged_rows
+from data_api.mapping.common import TIME_FORMAT
+
+METRICS = ["temperature", "humidity"]
+
+
+def make_frame(temperatures, humidities):
+    return pd.DataFrame({
+        "region_id": 1,
+        "time": pd.to_datetime("2025-03-01") + pd.to_timedelta(range(len(temperatures)), unit="h"),
+        "temperature": np.array(temperatures, dtype=np.float32),
+        "humidity": np.array(humidities, dtype=np.float32)
+    })
+
+
+def get_stored_digests(dataframe):
+    digests = compute_row_digests(dataframe, METRICS)
+    return {
+        (region_id, time.strftime(TIME_FORMAT)): digest
+        for region_id, time, digest in zip(dataframe["region_id"], dataframe["time"], digests)
+    }
+
+
+def drop_unchanged(dataframe, stored_digests):
+    return drop_unchanged_rows(dataframe, METRICS, stored_digests, dataframe["time"].dt.strftime(TIME_FORMAT))
+
+
+def test_unchanged_rows_are_dropped():
+    stored = make_frame([10, 11, 12], [50, 51, 52])
+    fetched = make_frame([10, 11.5, 12], [50, 51, 52])
+
+    changed = drop_unchanged(fetched, get_stored_digests(stored))
+
+    assert list(changed["time"].dt.hour) == [1]
+    assert DIGEST_COLUMN in changed
+
+
+def test_new_hours_are_kept():
+    stored = make_frame([10], [50])
+    fetched = make_frame([10, 11], [50, 51])
+
+    changed = drop_unchanged(fetched, get_stored_digests(stored))
+
+    assert list(changed["time"].dt.hour) == [1]
+
+
+def test_float_noise_below_the_digest_precision_is_not_a_change():
+    stored = make_frame([10.0], [50.0])
+    fetched = make_frame([10.00001], [50.0])
+
+    assert drop_unchanged(fetched, get_stored_digests(stored)).empty
+
+
+def test_missing_value_is_a_change():
+    stored = make_frame([10.0], [50.0])
+    fetched = make_frame([np.nan], [50.0])
+
+    assert len(drop_unchanged(fetched, get_stored_digests(stored))) == 1
@@ -0,0 +1,114 @@
+import numpy as np
+
+from data_api.lstm.feature_store import FeatureStore
+
+COLUMNS = ["temperature", "humidity"]
+HOUR = 3600
+
+
+def make_rows(hours, offset=0.0):
+    times = np.array(hours, dtype=np.int64) * HOUR
+    features = np.column_stack([np.array(hours, dtype=np.float32) + offset, np.array(hours, dtype=np.float32) * 10])
+    return times, features
+
+
+def read_region(store, region_id):
+    times, features = store.open_region(region_id)
+    return np.asarray(times), np.asarray(features)
+
+
+def test_write_then_append_after_last_hour(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    store.write_region(1, *make_rows([0, 1, 2]))
+    store.write_region(1, *make_rows([3, 4]))
+
+    times, features = read_region(store, 1)
+    np.testing.assert_array_equal(times, np.arange(5) * HOUR)
+    np.testing.assert_array_equal(features[:, 0], np.arange(5, dtype=np.float32))
+    assert features.dtype == np.float32
+
+
+def test_overlapping_hours_are_overwritten_in_place(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    store.write_region(1, *make_rows([0, 1, 2, 3]))
+    # Revised forecast of hours 2 and 3 plus a new hour 4
+    store.write_region(1, *make_rows([2, 3, 4], offset=100))
+
+    times, features = read_region(store, 1)
+    np.testing.assert_array_equal(times, np.arange(5) * HOUR)
+    np.testing.assert_array_equal(features[:, 0], [0, 1, 102, 103, 104])
+
+
+def test_duplicated_hours_keep_the_last_row(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    times = np.array([0, 1, 1, 2], dtype=np.int64) * HOUR
+    features = np.array([[0, 0], [1, 0], [5, 0], [2, 0]], dtype=np.float32)
+    store.write_region(1, times, features)
+
+    stored_times, stored_features = read_region(store, 1)
+    np.testing.assert_array_equal(stored_times, np.arange(3) * HOUR)
+    np.testing.assert_array_equal(stored_features[:, 0], [0, 5, 2])
+
+
+def test_unsorted_input_is_stored_by_time(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    store.write_region(1, *make_rows([2, 0, 1]))
+
+    times, features = read_region(store, 1)
+    np.testing.assert_array_equal(times, np.arange(3) * HOUR)
+    np.testing.assert_array_equal(features[:, 0], [0, 1, 2])
+
+
+def test_gap_before_last_hour_rewrites_the_region(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    store.write_region(1, *make_rows([0, 1, 4, 5]))
+    # Backfilled hours 2 and 3 land before the last stored hour
+    store.write_region(1, *make_rows([2, 3]))
+
+    times, features = read_region(store, 1)
+    np.testing.assert_array_equal(times, np.arange(6) * HOUR)
+    np.testing.assert_array_equal(features[:, 0], np.arange(6, dtype=np.float32))
+
+
+def test_interrupted_append_is_ignored_then_overwritten(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    store.write_region(1, *make_rows([0, 1]))
+    features_path, _ = store.get_paths(1)
+    # Features of an append whose times were never written
+    with open(features_path, "ab") as features_file:
+        features_file.write(np.array([[9, 9]], dtype=np.float32).tobytes())
+    assert store.get_row_count(1) == 2
+
+    store.write_region(1, *make_rows([2]))
+    times, features = read_region(store, 1)
+    np.testing.assert_array_equal(times, np.arange(3) * HOUR)
+    np.testing.assert_array_equal(features[:, 0], [0, 1, 2])
+
+
+def test_regions_are_stored_independently(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    store.write_region(1, *make_rows([0, 1]))
+    store.write_region(2, *make_rows([5]))
+
+    assert store.get_region_ids() == [1, 2]
+    assert store.get_row_count(1) == 2
+    store.delete_region(1)
+    assert not store.has_region(1)
+    assert store.get_row_count(2) == 1
+
+
+def test_changed_columns_clear_the_store(tmp_path):
+    store = FeatureStore(tmp_path, columns=COLUMNS)
+    store.write_region(1, *make_rows([0, 1]))
+
+    store = FeatureStore(tmp_path, columns=["temperature"])
+    assert not store.has_region(1)
+
+
+def test_store_touches_the_disk_only_when_used(tmp_path):
+    store_dir = tmp_path / "store"
+    store = FeatureStore(store_dir, columns=COLUMNS)
+    assert not store_dir.exists()
+
+    assert not store.has_region(1)
+    assert (store_dir / "manifest.json").exists()
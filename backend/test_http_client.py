@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from data_api import http_client
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(http_client.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def serve(monkeypatch, responses):
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        calls.append(url)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    monkeypatch.setattr(http_client.session, "get", get)
+    return calls
+
+
+def test_retry_after_in_seconds_and_as_http_date():
+    assert http_client.parse_retry_after("12") == 12
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=120)
+    assert 100 < http_client.parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 120
+    assert http_client.parse_retry_after("soon") is None
+
+
+def test_retry_after_is_capped(monkeypatch, sleeps):
+    monkeypatch.setattr(http_client, "MAX_RETRY_DELAY_SECONDS", 5)
+    calls = serve(monkeypatch, [FakeResponse(503, {"Retry-After": "40"}), FakeResponse(200)])
+
+    response = http_client.get_with_retry("https://provider.test/forecast")
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert sleeps == [5]
+
+
+def test_gives_up_when_retry_after_exceeds_the_budget(monkeypatch, sleeps):
+    monkeypatch.setattr(http_client, "RETRY_BUDGET_SECONDS", 60)
+    far_date = format_datetime(datetime.now(timezone.utc) + timedelta(days=1), usegmt=True)
+    calls = serve(monkeypatch, [FakeResponse(429, {"Retry-After": far_date}), FakeResponse(200)])
+
+    response = http_client.get_with_retry("https://provider.test/forecast")
+
+    assert response.status_code == 429
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_budget_is_shared_across_retries(monkeypatch, sleeps):
+    monkeypatch.setattr(http_client, "MAX_RETRY_DELAY_SECONDS", 30)
+    monkeypatch.setattr(http_client, "RETRY_BUDGET_SECONDS", 50)
+    calls = serve(monkeypatch, [FakeResponse(503, {"Retry-After": "30"})])
+
+    response = http_client.get_with_retry("https://provider.test/forecast")
+
+    # 30s spent, the next 30s wait doesn't fit in the 20s left
+    assert response.status_code == 503
+    assert len(calls) == 2
+    assert sleeps == [30]
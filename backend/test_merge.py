@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_api.mapping.merge import merge_sources
+
+
+def make_frame(hours, **metrics):
+    return pd.DataFrame({
+        "region_id": 1,
+        "time": pd.to_datetime("2025-03-01") + pd.to_timedelta(hours, unit="h"),
+        **{metric: np.array(values, dtype=np.float32) for metric, values in metrics.items()}
+    })
+
+
+def test_single_source_is_returned_as_is():
+    openmeteo = make_frame([0, 1], pressure=[1000, 1001])
+    assert merge_sources({"openmeteo": openmeteo, "visualcrossing": None}, ["pressure"]) is openmeteo
+
+
+def test_no_source_raises():
+    with pytest.raises(ValueError):
+        merge_sources({"openmeteo": None}, ["pressure"])
+
+
+def test_precedence_fills_missing_values_from_the_next_source():
+    merged = merge_sources({
+        "openmeteo": make_frame([0, 1], pressure=[1000, np.nan]),
+        "visualcrossing": make_frame([0, 1], pressure=[900, 901])
+    }, ["pressure"])
+
+    np.testing.assert_array_equal(merged["pressure"], [1000, 901])
+
+
+def test_average_skips_missing_values():
+    merged = merge_sources({
+        "openmeteo": make_frame([0, 1, 2], temperature=[10, np.nan, np.nan]),
+        "visualcrossing": make_frame([0, 1, 2], temperature=[20, 15, np.nan])
+    }, ["temperature"])
+
+    np.testing.assert_array_equal(merged["temperature"], [15, 15, np.nan])
+
+
+def test_hours_of_either_source_are_kept():
+    merged = merge_sources({
+        "openmeteo": make_frame([0, 1], pressure=[1000, 1001]),
+        "visualcrossing": make_frame([1, 2], pressure=[901, 902])
+    }, ["pressure"])
+
+    assert list(merged["time"].dt.hour) == [0, 1, 2]
+    np.testing.assert_array_equal(merged["pressure"], [1000, 1001, 902])
+
+
+def test_metric_missing_from_a_source():
+    merged = merge_sources({
+        "openmeteo": make_frame([0], pressure=[1000], snow=[1]),
+        "visualcrossing": make_frame([0], pressure=[900])
+    }, ["pressure", "snow"])
+
+    np.testing.assert_array_equal(merged["snow"], [1])
@@ -0,0 +1,52 @@
+from urllib.parse import parse_qs
+
+from data_api.pagination import build_next_query
+
+
+def make_get_param(query, body):
+    # Same lookup order as routes.get_request_param: query string, then body
+    def get_param(name, many):
+        if name in query:
+            return query[name] if many else query[name][0]
+        return body.get(name)
+    return get_param
+
+
+def test_next_query_keeps_filters_sent_in_the_body():
+    body = {
+        "regions": ["paris", "london"],
+        "metrics": ["temperature"],
+        "start": "2025-03-01",
+        "end": "2025-03-02",
+        "resolution": "day",
+        "aggregate": "max"
+    }
+    query = {"limit": ["2"]}
+
+    next_query = parse_qs(build_next_query(make_get_param(query, body), "abc", [("limit", "2")]))
+
+    assert next_query == {
+        "regions": ["paris", "london"],
+        "metrics": ["temperature"],
+        "start": ["2025-03-01"],
+        "end": ["2025-03-02"],
+        "limit": ["2"],
+        "resolution": ["day"],
+        "aggregate": ["max"],
+        "cursor": ["abc"]
+    }
+
+
+def test_next_query_keeps_query_string_filters_and_other_parameters():
+    query = {"regions": ["paris"], "limit": ["10"], "cursor": ["old"], "format": ["json"]}
+    extra_params = [(name, value) for name, values in query.items() for value in values]
+
+    next_query = parse_qs(build_next_query(make_get_param(query, {}), "new", extra_params))
+
+    assert next_query == {"regions": ["paris"], "limit": ["10"], "format": ["json"], "cursor": ["new"]}
+
+
+def test_single_body_value_of_a_list_filter():
+    next_query = parse_qs(build_next_query(make_get_param({}, {"regions": "paris"}), "abc"))
+
+    assert next_query["regions"] == ["paris"]
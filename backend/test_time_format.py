@@ -0,0 +1,31 @@
+import re
+
+from data_api.mapping.common import format_utc_timestamp
+
+# PostgREST rendering of the timestamptz `time` of hourly normalized_data rows
+HOURLY_TIME = "2025-03-03T05:00:00+00:00"
+HOURLY_TIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\+00:00$")
+
+
+def test_hourly_time_is_unchanged():
+    assert format_utc_timestamp(HOURLY_TIME) == HOURLY_TIME
+
+
+def test_day_bucket_matches_the_hourly_format():
+    # normalized_data_daily.day comes back as a date
+    day_time = format_utc_timestamp("2025-03-03")
+
+    assert day_time == "2025-03-03T00:00:00+00:00"
+    assert HOURLY_TIME_PATTERN.match(day_time)
+
+
+def test_week_bucket_matches_the_hourly_format():
+    # date_trunc('week', timestamptz) through to_jsonb
+    week_time = format_utc_timestamp("2025-03-03T00:00:00+00:00")
+
+    assert week_time == "2025-03-03T00:00:00+00:00"
+    assert HOURLY_TIME_PATTERN.match(week_time)
+
+
+def test_other_offsets_are_converted_to_utc():
+    assert format_utc_timestamp("2025-03-03T02:00:00+02:00") == "2025-03-03T00:00:00+00:00"